@@ -1,5 +1,5 @@
+from typing import Any, Optional
 from pydantic_settings import BaseSettings
-from langchain_openai import ChatOpenAI
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -15,16 +15,114 @@ class Settings(BaseSettings):
     PORT: int = 8000
     MAINTENANCE_MODE: bool = False
     
-    # Singleton LLM instance
-    _llm: ChatOpenAI | None = None
+    # Research job queue
+    MAX_CONCURRENT_RUNS: int = 2
+    MAX_QUEUED_RUNS: int = 50
+    JOB_HISTORY_LIMIT: int = 100
+    # Workers refresh their jobs' heartbeat this often; queued or running jobs whose heartbeat
+    # is older than JOB_STALE_SECONDS (e.g. after a restart) are resumed by another worker
+    JOB_HEARTBEAT_SECONDS: int = 15
+    JOB_STALE_SECONDS: int = 90
+    
+    # Graph checkpoints ("sqlite" or "memory")
+    CHECKPOINT_BACKEND: str = "sqlite"
+    CHECKPOINT_PATH: str = "data/checkpoints.sqlite"
+    CHECKPOINT_TTL_SECONDS: int = 86400
+    CHECKPOINT_SWEEP_SECONDS: int = 600
+    
+    # Token budget of the search context in answer and section prompts (0 for no limit)
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    # Passages ranked by BM25 against the question kept for answers (0 to send all context)
+    RETRIEVAL_TOP_K: int = 8
+    RETRIEVAL_PASSAGE_WORDS: int = 150
+    
+    # Report synthesis: "combined" writes introduction, body and conclusion in one call and
+    # sends the sections once (about a third of the input tokens), but the podcast script can
+    # only start after the whole call; "separate" makes one call per part, so the podcast
+    # starts as soon as the body is written. "auto" picks "separate" while podcast streaming
+    # is on (PODCAST_STREAMING in frames mode) and "combined" otherwise.
+    REPORT_SYNTHESIS_MODE: str = "auto"
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_PATH: str = "data/llm_cache.sqlite"
+    LLM_CACHE_TTL_SECONDS: int = 604800
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_MAX_BYTES: int = 268435456
+    
+    # Search result cache (TTLs in seconds per source)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_PATH: str = "data/search_cache.sqlite"
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+    SEARCH_CACHE_MAX_BYTES: int = 134217728
+    SEARCH_CACHE_TTL_WEB: int = 21600
+    SEARCH_CACHE_TTL_WIKIPEDIA: int = 604800
+    SEARCH_CACHE_TTL_NEWS: int = 1800
+    
+    # Text-to-speech
+    TTS_MODEL: str = "tts-1"
+    TTS_MAX_CONCURRENCY: int = 8
+    TTS_REQUESTS_PER_MINUTE: int = 50
+    TTS_MAX_RETRIES: int = 4
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_PATH: str = "data/tts_cache.sqlite"
+    TTS_CACHE_MAX_BYTES: int = 536870912
+    AUDIO_DIR: str = "data/audio"
+    PODCAST_ASSEMBLY_MODE: str = "frames"  # "frames" joins MP3 frames, "pydub" decodes and re-encodes
+    PODCAST_STREAMING: bool = True  # Stream turns to listeners while synthesizing (frames mode only)
+    
+    # Outbound HTTP connection pools shared by every integration
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_MAX_HOSTS: int = 10
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_TIMEOUT_SECONDS: float = 60.0
+    HTTP2_ENABLED: bool = True  # Used when the h2 package is installed
+    
+    # News briefing tool cache
+    NEWS_BRIEFING_REFRESH_SECONDS: int = 900
+    NEWS_BRIEFING_MAX_STALE_SECONDS: int = 3600
+    
+    # Metrics (per-run traces are written here as <thread_id>.json when set)
+    METRICS_TRACE_DIR: Optional[str] = None
+    LLM_PROMPT_PRICE_PER_1M: float = 0.15  # USD, gpt-4o-mini
+    LLM_COMPLETION_PRICE_PER_1M: float = 0.60
+    
+    # Background health checks of external APIs
+    HEALTH_CHECK_INTERVAL_SECONDS: int = 60
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 10.0
+    
+    # Startup ("background", "blocking", "preload" or "off")
+    STARTUP_WARMUP: str = "background"
+    STARTUP_BUDGET_MS: int = 1000
+    
+    # Singleton LLM instance (ChatOpenAI, imported on first use to keep startup fast)
+    _llm: Any = None
     
     @property
-    def llm(self) -> ChatOpenAI:
+    def llm(self):
         """Returns singleton LLM instance"""
         if self._llm is None:
-            self._llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+            from langchain_openai import ChatOpenAI
+            from app.services.clients import get_http_client, get_async_http_client
+            self._llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                temperature=0,
+                stream_usage=True,
+                http_client=get_http_client(),
+                http_async_client=get_async_http_client()
+            )
         return self._llm
 
+    @property
+    def combined_report_synthesis(self) -> bool:
+        """Whether REPORT_SYNTHESIS_MODE resolves to a single combined call"""
+        if self.REPORT_SYNTHESIS_MODE == "auto":
+            return not (self.PODCAST_STREAMING and self.PODCAST_ASSEMBLY_MODE == "frames")
+        return self.REPORT_SYNTHESIS_MODE == "combined"
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,20 +1,25 @@
 import os
 import logging
+import asyncio
+# Imported first so the cold-start measurement covers every other import
+from app.services.startup import LazyResearchGraph, preload, warm_up, log_cold_start
+from app.services import clients
+from app.services.health import get_health_monitor
+from app.utils.metrics import REGISTRY, timed
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 import uvicorn
-import base64
-from app.workflows.graph_builder import build_research_graph
-from app.services.services import generate_podcast_audio_async
+from app.services.jobs import JobManager, JobQueueFull
+from app.services.checkpoints import open_checkpointer, ThreadJanitor
+from app.services.audio_store import AudioStore, parse_byte_range
 import tempfile
 from datetime import datetime
-from io import BytesIO
-from pydub import AudioSegment
-import re
+import json
 from contextlib import asynccontextmanager
 from uuid import uuid4
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from app.config import settings
 
 
@@ -29,14 +34,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+if settings.STARTUP_WARMUP == "preload":
+    # Load the heavy modules before a pre-fork server (gunicorn --preload) forks its workers
+    preload()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
-    app.state.graph = build_research_graph()
-    yield
-    # Shutdown
-    logger.info("Shutting down...")
+    async with open_checkpointer(settings.CHECKPOINT_BACKEND, settings.CHECKPOINT_PATH) as checkpointer:
+        # The graph is compiled on first use (or by the warm-up below), not at import time
+        app.state.graph = LazyResearchGraph(checkpointer, use_async=True)
+        app.state.audio = AudioStore(settings.AUDIO_DIR)
+        app.state.janitor = ThreadJanitor(
+            checkpointer,
+            path=settings.CHECKPOINT_PATH if settings.CHECKPOINT_BACKEND == "sqlite" else ":memory:",
+            ttl_seconds=settings.CHECKPOINT_TTL_SECONDS,
+            sweep_seconds=settings.CHECKPOINT_SWEEP_SECONDS,
+            on_evict=app.state.audio.delete
+        )
+        app.state.jobs = JobManager(
+            app.state.graph,
+            app.state.audio,
+            max_workers=settings.MAX_CONCURRENT_RUNS,
+            max_queued=settings.MAX_QUEUED_RUNS,
+            history_limit=settings.JOB_HISTORY_LIMIT,
+            janitor=app.state.janitor
+        )
+        await app.state.janitor.start()
+        await app.state.jobs.start()
+        app.state.health = get_health_monitor()
+        await app.state.health.start()
+        warmup_task = None
+        if settings.STARTUP_WARMUP == "blocking":
+            await asyncio.to_thread(warm_up, app.state.graph)
+        elif settings.STARTUP_WARMUP in ("background", "preload"):
+            # Become ready right away and warm up while the first health checks come in
+            warmup_task = asyncio.ensure_future(asyncio.to_thread(warm_up, app.state.graph))
+        log_cold_start()
+        yield
+        # Shutdown
+        logger.info("Shutting down...")
+        if warmup_task is not None:
+            await warmup_task
+        await app.state.health.stop()
+        await app.state.jobs.stop()
+        await app.state.janitor.stop()
+        await clients.aclose_all()
 
 # Initialize FastAPI app
 app = FastAPI(lifespan=lifespan)
@@ -48,9 +92,6 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 # Create Jinja2Templates instance
 templates = Jinja2Templates(directory=TEMPLATE_DIR)
 
-# Add b64encode filter to Jinja2Templates
-templates.env.filters["b64encode"] = lambda v: base64.b64encode(v).decode()
-
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """
@@ -75,16 +116,17 @@ async def submit_text(request: Request):
     logger.info("User Text: %s", user_text)
 
     # Use existing graph from app state
-    graph = request.app.state.graph
+    graph = await request.app.state.graph.aget()
     max_analysts = 3
     topic = user_text
     thread = {"configurable": {"thread_id": str(uuid4())}}
 
     # Initial run to get analysts
-    graph.invoke({"topic": topic, "max_analysts": max_analysts}, thread)
+    await graph.ainvoke({"topic": topic, "max_analysts": max_analysts}, thread)
+    await request.app.state.janitor.touch(thread["configurable"]["thread_id"])
     
     # Get current state to display analysts
-    current_state = graph.get_state(thread)
+    current_state = await graph.aget_state(thread)
     analysts = current_state.values.get('analysts', [])
 
     return templates.TemplateResponse(
@@ -109,50 +151,55 @@ async def submit_feedback(request: Request):
     max_analysts = int(form_data.get("max_analysts", "3"))
     
     thread = {"configurable": {"thread_id": thread_id}}
-    graph = request.app.state.graph
+    graph = await request.app.state.graph.aget()
+    await request.app.state.janitor.touch(thread_id)
 
     logger.info("Gathering User feedback...")
     if feedback == "approve":
         # Continue with existing approval flow
         logger.info(f"User feedback: Approved")
-        graph.update_state(thread, {"human_analyst_feedback": None}, as_node="human_feedback")
-        
-        # Stream the graph to continue execution
-        logger.info("Continuing graph execution after approval...")
-        for event in graph.stream(None, thread, stream_mode="values"):
-            logger.info(f"Processing node: {event.keys()}")
-        
-        # Get final state after streaming
-        final_state = graph.get_state(thread)
-        report = final_state.values.get('final_report')
-        podcast = final_state.values.get('podcast_script')
-        analysts = final_state.values.get('analysts', [])
+        jobs = request.app.state.jobs
+        maintenance = templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "maintenance_mode": True
+            },
+            status_code=503
+        )
+        if not jobs.has_room():
+            # Checked before approving, so the thread stays at the feedback step
+            logger.warning(f"Rejecting research run for thread {thread_id}: research queue is full")
+            return maintenance
+        await graph.aupdate_state(thread, {"human_analyst_feedback": None}, as_node="human_feedback")
         
-        # Generate audio using the service function
-        audio = await generate_podcast_audio_async(podcast, analysts) if podcast else None
+        # Hand the rest of the run to the background job queue
+        try:
+            await jobs.enqueue(thread_id)
+        except JobQueueFull as e:
+            # The queue filled up while approving; record the run as failed rather than running
+            logger.warning(f"Rejecting research run for thread {thread_id}: {str(e)}")
+            await jobs.reject(thread_id, str(e))
+            return maintenance
 
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
-                "result": report,
-                "audio_content": audio,
-                "show_feedback_form": True,
-                "analysts": analysts,
+                "job_pending": True,
                 "topic": topic,
                 "max_analysts": max_analysts,
-                "thread_id": thread_id,
-                "loading": True
+                "thread_id": thread_id
             }
         )
     else:
         # Handle feedback and show new analysts
         logger.info(f"User feedback: {feedback}")
-        graph.update_state(thread, {"human_analyst_feedback": feedback}, as_node="human_feedback")
+        await graph.aupdate_state(thread, {"human_analyst_feedback": feedback}, as_node="human_feedback")
         
         # Get new analysts
         new_analysts = []
-        for event in graph.stream(None, thread, stream_mode="values"):
+        async for event in graph.astream(None, thread, stream_mode="values"):
             analysts = event.get('analysts', '')
             if analysts:
                 new_analysts = analysts
@@ -170,6 +217,157 @@ async def submit_feedback(request: Request):
             }
         )
 
+@app.get("/healthz")
+async def healthz(request: Request):
+    """Report the cached status of the external APIs and whether the research graph is loaded"""
+    return {
+        **request.app.state.health.report(),
+        "graph_ready": request.app.state.graph.ready
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Export latency, token, audio and cache metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/jobs/{thread_id}")
+async def job_status(request: Request, thread_id: str):
+    """Report the progress of a queued or running research job"""
+    job = await request.app.state.jobs.lookup(thread_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    return job.to_dict()
+
+@app.get("/jobs/{thread_id}/events")
+async def job_events(request: Request, thread_id: str):
+    """Stream job progress, interview sections and report parts as server-sent events"""
+    job = await request.app.state.jobs.lookup(thread_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    if job.remote and not job.done:
+        return JSONResponse(
+            {"error": f"Job is running in another worker, poll /jobs/{thread_id} for its status", **job.to_dict()},
+            status_code=409
+        )
+
+    async def event_stream():
+        async for event in job.subscribe(keepalive=15):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@app.get("/jobs/{thread_id}/result")
+async def job_result(request: Request, thread_id: str):
+    """Return the finished report and podcast script of a research job"""
+    job = await request.app.state.jobs.lookup(thread_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    if not job.done:
+        return JSONResponse({"error": "Job not finished", **job.to_dict()}, status_code=409)
+    return {
+        **job.to_dict(),
+        "report": job.report,
+        "podcast_script": job.podcast_script,
+        "audio_url": f"/audio/{thread_id}" if job.has_audio else None
+    }
+
+@app.get("/audio/{thread_id}/live")
+async def podcast_audio_live(request: Request, thread_id: str):
+    """Stream a podcast while it is still being synthesized, turn by turn"""
+    live = request.app.state.audio.get_live(thread_id)
+    if live is None:
+        if request.app.state.audio.exists(thread_id):
+            return RedirectResponse(f"/audio/{thread_id}")
+        return JSONResponse({"error": "No audio stream available"}, status_code=404)
+
+    return StreamingResponse(
+        live.iter(),
+        media_type="audio/mpeg",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Content-Type-Options": "nosniff"
+        }
+    )
+
+@app.api_route("/audio/{thread_id}", methods=["GET", "HEAD"])
+async def podcast_audio(request: Request, thread_id: str):
+    """Serve a thread's podcast with HTTP Range, ETag and caching support"""
+    store = request.app.state.audio
+    stat = store.stat(thread_id)
+    if stat is None:
+        return JSONResponse({"error": "No audio available"}, status_code=404)
+
+    etag = store.etag(stat)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, max-age=86400",
+        "X-Content-Type-Options": "nosniff"
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    size = stat.st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        # The client's partial copy is stale, so send the whole file
+        range_header = None
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type="audio/mpeg")
+    return StreamingResponse(
+        store.iter_file(thread_id, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type="audio/mpeg"
+    )
+
+@app.get("/results/{thread_id}", response_class=HTMLResponse)
+async def job_results_page(request: Request, thread_id: str):
+    """Render the finished report and podcast of a research job"""
+    job = await request.app.state.jobs.lookup(thread_id)
+    if job is None or not job.done:
+        return templates.TemplateResponse("index.html", {
+            "request": request,
+            "job_pending": job is not None,
+            "thread_id": thread_id
+        })
+
+    return templates.TemplateResponse(
+        "index.html",
+        {
+            "request": request,
+            "result": job.report,
+            "audio_url": f"/audio/{thread_id}" if job.has_audio else None,
+            "job_error": job.error,
+            "thread_id": thread_id
+        }
+    )
+
 @app.get("/download-report")
 async def download_report(request: Request):
     # Get thread_id from query parameters
@@ -179,15 +377,31 @@ async def download_report(request: Request):
         return {"error": "No thread ID provided"}
     
     # Get the graph and thread from app state
-    graph = request.app.state.graph
+    graph = await request.app.state.graph.aget()
     thread = {"configurable": {"thread_id": thread_id}}
     
     # Get final state from graph
-    final_state = graph.get_state(thread)
+    final_state = await graph.aget_state(thread)
     final_report = final_state.values.get('final_report') if final_state else None
     
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+    # Render the PDF in a worker thread so the event loop stays responsive
+    pdf_path = await run_in_threadpool(_render_report_pdf, final_report, thread_id)
+    filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    
+    return FileResponse(
+        path=pdf_path,
+        filename=filename,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Security-Policy": "default-src 'self'",
+            "X-Content-Type-Options": "nosniff"
+        }
+    )
+
+def _render_report_pdf(final_report, thread_id):
+    """Render the report to a temporary PDF file and return its path"""
+    with timed("pdf", "render"), tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
         from fpdf import FPDF
         pdf = FPDF()
         pdf.add_page()
@@ -204,19 +418,7 @@ async def download_report(request: Request):
             logger.warning(f"Download report - No report content available for thread ID: {thread_id}")
             
         pdf.output(tmp.name)
-        
-        filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
-        return FileResponse(
-            path=tmp.name,
-            filename=filename,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Security-Policy": "default-src 'self'",
-                "X-Content-Type-Options": "nosniff"
-            }
-        )
+        return tmp.name
 
 # Main block to run the application
 def main():
@@ -41,6 +41,7 @@ class GenerateAnalystsState(TypedDict):
 class InterviewState(MessagesState):
     max_num_turns: int # Number turns of conversation
     context: Annotated[list, operator.add] # Source docs
+    search_query: str # Search query shared by the search nodes for the current turn
     analyst: Analyst # Analyst asking questions
     interview: str # Interview transcript
     sections: list # Final key we duplicate in outer state for Send() API
@@ -48,6 +49,17 @@ class InterviewState(MessagesState):
 class SearchQuery(BaseModel):
     search_query: str = Field(None, description="Search query for retrieval.")
 
+class ReportSynthesis(BaseModel):
+    introduction: str = Field(
+        description="Report title and introduction in markdown, starting with the # title.",
+    )
+    content: str = Field(
+        description="Report body in markdown, starting with ## Insights and ending with the ## Sources section.",
+    )
+    conclusion: str = Field(
+        description="Report conclusion in markdown, starting with ## Conclusion.",
+    )
+
 class ResearchGraphState(TypedDict):
     topic: str # Research topic
     max_analysts: int # Number of analysts
@@ -193,6 +193,49 @@ intro_conclusion_instructions = """You are a technical writer finishing a report
     Here are the sections to reflect on for writing: {formatted_str_sections}"""
 
 
+report_synthesis_instructions = """You are a technical writer creating a report on this overall topic: 
+
+{topic}
+    
+You have a team of analysts. Each analyst has done two things: 
+
+1. They conducted an interview with an expert on a specific sub-topic.
+2. They write up their finding into a memo.
+
+Your task is to write the complete report from these memos in three parts: an introduction, the report body and a conclusion.
+
+For the report body:
+
+1. Think carefully about the insights from each memo.
+2. Consolidate these into a crisp overall summary that ties together the central ideas from all of the memos. 
+3. Summarize the central points in each memo into a cohesive single narrative.
+4. Use no sub-heading. 
+5. Start the body with a single title header: ## Insights
+6. Preserve any citations in the memos, which will be annotated in brackets, for example [1] or [2].
+7. Create a final, consolidated list of sources and add to a Sources section with the `## Sources` header.
+8. List your sources in order and do not repeat.
+
+[1] Source 1
+[2] Source 2
+
+For the introduction and conclusion:
+
+1. Target around 100 words each, crisply previewing (for introduction) or recapping (for conclusion) the report body.
+2. For your introduction, create a compelling title and use the # header for the title.
+3. For your introduction, use ## Introduction as the section header. 
+4. For your conclusion, use ## Conclusion as the section header.
+
+For all three parts:
+
+1. Use markdown formatting. 
+2. Include no pre-amble.
+3. Do not mention any analyst names.
+4. Prioritize recent data over older data, and mention dates where applicable.
+
+Here are the memos from your analysts to build your report from: 
+
+{context}"""
+
 # Generate podcast version
 podcast_prompt = """You are Samantha, the host of `Tech Talk Roundtable`, moderating a roundtable discussion on {topic}.
     Create a natural conversation between you and these analysts:
@@ -0,0 +1,171 @@
+"""File-backed storage of synthesized podcasts, served with HTTP range support"""
+
+
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_THREAD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+_BYTE_RANGE = re.compile(r"^(\d*)-(\d*)$")
+
+
+class LiveAudio:
+    """
+    In-memory MP3 stream that is still being synthesized.
+    
+    Listeners replay everything appended so far and then follow new turns as they arrive,
+    until finish() is called.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def append(self, data: bytes):
+        if data:
+            self.parts.append(data)
+            self._notify()
+
+    def finish(self):
+        self.done = True
+        self._notify()
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+    async def iter(self):
+        index = 0
+        while True:
+            while index < len(self.parts):
+                yield self.parts[index]
+                index += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+
+class AudioStore:
+    """
+    Stores one MP3 per research thread under a directory shared by every worker.
+    
+    Files are written atomically, so readers never see a partially written episode.
+    While an episode is being synthesized it is also available as a LiveAudio stream
+    in the worker producing it.
+    """
+
+    def __init__(self, directory: str = "data/audio"):
+        self.directory = directory
+        self.live = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def open_live(self, thread_id: str) -> LiveAudio:
+        self.live[thread_id] = LiveAudio()
+        return self.live[thread_id]
+
+    def get_live(self, thread_id: str) -> Optional[LiveAudio]:
+        return self.live.get(thread_id)
+
+    def close_live(self, thread_id: str):
+        live = self.live.pop(thread_id, None)
+        if live is not None and not live.done:
+            live.finish()
+
+    def path(self, thread_id: str) -> str:
+        if not _THREAD_ID_PATTERN.match(thread_id or ""):
+            raise ValueError(f"Invalid thread id: {thread_id!r}")
+        return os.path.join(self.directory, f"{thread_id}.mp3")
+
+    def _write(self, thread_id: str, audio: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(audio)
+            os.replace(tmp_path, self.path(thread_id))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    async def save(self, thread_id: str, audio: bytes):
+        await asyncio.to_thread(self._write, thread_id, audio)
+        logger.info(f"Stored {len(audio)} bytes of podcast audio for thread {thread_id}")
+
+    def stat(self, thread_id: str) -> Optional[os.stat_result]:
+        """File metadata for the thread's audio, or None if there is none"""
+        try:
+            return os.stat(self.path(thread_id))
+        except (OSError, ValueError):
+            return None
+
+    def exists(self, thread_id: str) -> bool:
+        return self.stat(thread_id) is not None
+
+    def delete(self, thread_id: str):
+        try:
+            os.unlink(self.path(thread_id))
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def etag(stat: os.stat_result) -> str:
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def iter_file(self, thread_id: str, start: int, end: int, chunk_size: int = 65536):
+        """Yield bytes start..end (inclusive) of the thread's audio"""
+        with open(self.path(thread_id), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "Range: bytes=..." header against a resource of the given size.
+    
+    A header with invalid syntax is ignored, as RFC 7233 requires, so the whole resource
+    is served.
+    
+    Returns:
+        The inclusive (start, end) byte range, or None to serve the whole resource
+        
+    Raises:
+        ValueError: If the range is well-formed but can't be satisfied
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    ranges = header[len("bytes="):].split(",")
+    if len(ranges) != 1:
+        # Multipart ranges aren't worth supporting for audio; serve the whole file
+        return None
+    match = _BYTE_RANGE.match(ranges[0].strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError(f"Unsatisfiable range: {header}")
+        return max(0, size - length), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    end = int(end) if end else size - 1
+    if start >= size:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, min(end, size - 1)
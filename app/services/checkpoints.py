@@ -0,0 +1,234 @@
+"""Checkpointer backends and TTL eviction of finished research threads"""
+
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def open_checkpointer(backend: str = "sqlite", path: str = "data/checkpoints.sqlite"):
+    """
+    Open the graph checkpointer for the configured backend.
+    
+    Args:
+        backend: "sqlite" for a file-backed store shared by every worker on the host,
+            or "memory" for the per-process MemorySaver
+        path: Database file used by the sqlite backend
+        
+    Yields:
+        A checkpointer that can be passed to build_research_graph
+    """
+    if backend == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        yield MemorySaver()
+    elif backend == "sqlite":
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        _ensure_parent_dir(path)
+        async with AsyncSqliteSaver.from_conn_string(path) as saver:
+            await saver.setup()
+            logger.info(f"Using SQLite checkpointer at {path}")
+            yield saver
+    else:
+        raise ValueError(f"Unknown checkpoint backend: {backend}")
+
+
+def _delete_memory_thread(saver, thread_id: str):
+    """Drop a thread's checkpoints, pending writes and channel blobs from a MemorySaver"""
+    saver.storage.pop(thread_id, None)
+    for store in (saver.writes, saver.blobs):
+        for key in [key for key in store if key[0] == thread_id]:
+            del store[key]
+
+
+def _ensure_parent_dir(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+class ThreadJanitor:
+    """
+    Tracks the last activity of every research thread and evicts stale checkpoints.
+    
+    Activity is recorded in a small SQLite table (next to the checkpoints for the sqlite
+    backend, in memory otherwise) so that every worker sharing the checkpoint file also
+    shares the eviction bookkeeping. Threads idle for longer than ttl_seconds, whether
+    finished or abandoned at the feedback step, are deleted from the checkpointer, and
+    on_evict(thread_id) is called to release any other per-thread resources.
+    
+    The same database holds the status of every research job, with the worker that owns
+    it and a heartbeat, so any worker can report a job's status and take over the jobs of
+    a worker that stopped.
+    """
+
+    def __init__(self, checkpointer, path: str = ":memory:", ttl_seconds: int = 86400, sweep_seconds: int = 600,
+                 on_evict=None):
+        self.checkpointer = checkpointer
+        self.on_evict = on_evict
+        self.ttl_seconds = ttl_seconds
+        self.sweep_seconds = sweep_seconds
+        if path != ":memory:":
+            _ensure_parent_dir(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_activity ("
+            "thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS research_jobs ("
+            "thread_id TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, owner TEXT NOT NULL, "
+            "heartbeat_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._task = None
+
+    def _touch(self, thread_id: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time())
+            )
+            self._conn.commit()
+
+    def _expired(self) -> list:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _forget(self, thread_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM research_jobs WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def _set_job_status(self, thread_id: str, status: str, owner: str, error: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_jobs (thread_id, status, error, owner, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (thread_id, status, error, owner, time.time())
+            )
+            self._conn.commit()
+
+    def _job_status(self, thread_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, error, owner, heartbeat_at FROM research_jobs WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "error": row[1], "owner": row[2], "heartbeat_at": row[3]}
+
+    def _heartbeat(self, owner: str, thread_ids: list):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE research_jobs SET heartbeat_at = ? WHERE thread_id = ? AND owner = ?",
+                [(time.time(), thread_id, owner) for thread_id in thread_ids]
+            )
+            self._conn.commit()
+
+    def _claim_stale_jobs(self, owner: str, statuses: tuple, stale_seconds: float, limit: int) -> list:
+        cutoff = time.time() - stale_seconds
+        claimed = []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT thread_id, owner FROM research_jobs WHERE heartbeat_at < ? "
+                f"AND status IN ({','.join('?' * len(statuses))}) ORDER BY heartbeat_at LIMIT ?",
+                (cutoff, *statuses, limit)
+            ).fetchall()
+            for thread_id, previous_owner in rows:
+                # Only one worker wins the update if several notice the same stale job
+                cursor = self._conn.execute(
+                    "UPDATE research_jobs SET owner = ?, heartbeat_at = ? "
+                    "WHERE thread_id = ? AND owner = ? AND heartbeat_at < ?",
+                    (owner, time.time(), thread_id, previous_owner, cutoff)
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(thread_id)
+            self._conn.commit()
+        return claimed
+
+    async def touch(self, thread_id: str):
+        """Record activity on a thread, restarting its TTL"""
+        await asyncio.to_thread(self._touch, thread_id)
+
+    async def set_job_status(self, thread_id: str, status: str, owner: str, error: Optional[str] = None):
+        """Record the status of a research job and the worker that owns it"""
+        await asyncio.to_thread(self._set_job_status, thread_id, status, owner, error)
+
+    async def job_status(self, thread_id: str) -> Optional[dict]:
+        """The recorded status, error, owner and heartbeat_at of a research job, if any"""
+        return await asyncio.to_thread(self._job_status, thread_id)
+
+    async def heartbeat(self, owner: str, thread_ids: list):
+        """Refresh the heartbeat of the given jobs, as long as owner still owns them"""
+        if thread_ids:
+            await asyncio.to_thread(self._heartbeat, owner, thread_ids)
+
+    async def claim_stale_jobs(self, owner: str, statuses: tuple, stale_seconds: float, limit: int) -> list:
+        """
+        Take over up to limit jobs in one of statuses whose heartbeat is older than stale_seconds.
+        
+        Returns:
+            The thread ids now owned by owner
+        """
+        if limit <= 0:
+            return []
+        return await asyncio.to_thread(self._claim_stale_jobs, owner, statuses, stale_seconds, limit)
+
+    async def _delete_thread(self, thread_id: str):
+        delete = getattr(self.checkpointer, "adelete_thread", None)
+        if delete is not None:
+            await delete(thread_id)
+        elif hasattr(self.checkpointer, "storage"):
+            # MemorySaver has no delete API in the locked langgraph-checkpoint
+            _delete_memory_thread(self.checkpointer, thread_id)
+        else:
+            raise NotImplementedError(f"{type(self.checkpointer).__name__} can't delete threads")
+
+    async def sweep(self) -> int:
+        """Delete the checkpoints of every expired thread and return how many were evicted"""
+        expired = await asyncio.to_thread(self._expired)
+        evicted = 0
+        for thread_id in expired:
+            try:
+                await self._delete_thread(thread_id)
+                if self.on_evict is not None:
+                    await asyncio.to_thread(self.on_evict, thread_id)
+                await asyncio.to_thread(self._forget, thread_id)
+                evicted += 1
+            except Exception as e:
+                logger.error(f"Failed to evict thread {thread_id}: {str(e)}", exc_info=True)
+        if expired:
+            logger.info(f"Evicted {evicted} of {len(expired)} expired research threads")
+        return evicted
+
+    async def start(self):
+        """Start sweeping expired threads in the background"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._conn.close()
+
+    async def _run(self):
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self.sweep_seconds)
@@ -0,0 +1,157 @@
+"""
+Shared registry of external API clients.
+
+Every client is created on first use and reused for the life of the process, so the
+graph nodes, tools and TTS engine share one client per provider. The OpenAI clients,
+ChatOpenAI and NewsAPI send their requests through the pooled HTTP clients below
+(keep-alive, HTTP/2 when the h2 package is installed, connection limits and timeouts),
+so TCP and TLS setup is paid once per host rather than once per call. Tavily and the
+WikipediaLoader don't accept an injected HTTP client and still open their own
+connections (langchain_community posts to Tavily with bare requests calls, or a new
+aiohttp session per async call). The SDKs are imported inside the getters to keep them
+off the startup path.
+"""
+
+
+import importlib.util
+import logging
+import threading
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+# Reentrant because some clients are built on top of others (e.g. NewsAPI on the requests session)
+_lock = threading.RLock()
+
+
+def _get_or_create(name: str, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory()
+                _clients[name] = client
+                logger.info(f"Created shared {name} client")
+    return client
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and the h2 package needed by httpx is installed"""
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _httpx_options() -> dict:
+    import httpx
+
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        "timeout": httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT),
+    }
+
+
+def get_http_client():
+    """Returns the shared blocking httpx client"""
+    def create():
+        import httpx
+        return httpx.Client(**_httpx_options())
+    return _get_or_create("httpx", create)
+
+
+def get_async_http_client():
+    """Returns the shared asyncio httpx client"""
+    def create():
+        import httpx
+        return httpx.AsyncClient(**_httpx_options())
+    return _get_or_create("async_httpx", create)
+
+
+def get_http_session():
+    """
+    Returns the shared requests session, for integrations built on requests.
+    
+    Connections are pooled per host (HTTP/1.1 only) and every request gets the
+    configured timeouts unless the caller passes its own.
+    """
+    def create():
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        class TimeoutHTTPAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_TIMEOUT_SECONDS)
+                return super().send(request, **kwargs)
+
+        session = requests.Session()
+        adapter = TimeoutHTTPAdapter(
+            pool_connections=settings.HTTP_MAX_HOSTS,
+            pool_maxsize=settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    return _get_or_create("requests", create)
+
+
+def get_tavily_search():
+    """Returns the shared Tavily web search tool"""
+    def create():
+        from langchain_community.tools.tavily_search import TavilySearchResults
+        return TavilySearchResults(api_key=settings.TAVILY_API_KEY, max_results=5)
+    return _get_or_create("tavily", create)
+
+
+def get_news_api():
+    """Returns the shared NewsAPI client"""
+    def create():
+        from newsapi import NewsApiClient
+        return NewsApiClient(api_key=settings.NEWS_API_KEY, session=get_http_session())
+    return _get_or_create("newsapi", create)
+
+
+def get_openai_client():
+    """Returns the shared blocking OpenAI client"""
+    def create():
+        from openai import OpenAI
+        return OpenAI(api_key=settings.OPENAI_API_KEY, http_client=get_http_client())
+    return _get_or_create("openai", create)
+
+
+def get_async_openai_client():
+    """Returns the shared asyncio OpenAI client"""
+    def create():
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=get_async_http_client())
+    return _get_or_create("async_openai", create)
+
+
+def create_all():
+    """Create every client up front (used to warm a worker before it takes traffic)"""
+    settings.llm
+    get_http_session()
+    get_tavily_search()
+    get_news_api()
+    get_openai_client()
+    get_async_openai_client()
+
+
+async def aclose_all():
+    """Close the pooled HTTP connections, called on shutdown"""
+    with _lock:
+        clients = dict(_clients)
+        _clients.clear()
+    if "async_httpx" in clients:
+        await clients["async_httpx"].aclose()
+    if "httpx" in clients:
+        clients["httpx"].close()
+    if "requests" in clients:
+        clients["requests"].close()
@@ -0,0 +1,109 @@
+"""Background health checks of the external APIs, with cached status for tools and /healthz"""
+
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.config import settings
+from app.services.clients import get_async_openai_client
+
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Periodically probes the external APIs and caches the result.
+
+    Probes run on a background task every interval_seconds, so callers (tools, the
+    /healthz endpoint) read the last known status instead of paying for a round trip.
+    The OpenAI probe lists the available models, which costs no tokens. A dependency
+    that hasn't been probed yet is reported as unknown and treated as healthy.
+
+    Args:
+        interval_seconds: Time between probe rounds
+        timeout_seconds: Time after which a single probe counts as failed
+    """
+
+    def __init__(self, interval_seconds: int = 60, timeout_seconds: float = 10.0):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.checks = {"openai": self._probe_openai}
+        self.status = {}
+        self._task = None
+
+    @staticmethod
+    async def _probe_openai():
+        await get_async_openai_client().models.list()
+
+    async def _run_check(self, name: str, probe):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout_seconds)
+            error = None
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        healthy = error is None
+        previous = self.status.get(name)
+        if previous is not None and previous["healthy"] != healthy:
+            logger.warning(f"Health check {name} changed to {'healthy' if healthy else 'unhealthy'}: {error or 'ok'}")
+        elif previous is None and not healthy:
+            logger.warning(f"Health check {name} failed: {error}")
+        self.status[name] = {
+            "healthy": healthy,
+            "latency_ms": round((time.perf_counter() - started) * 1000),
+            "checked_at": time.time(),
+            "error": error
+        }
+
+    async def check(self):
+        """Run every probe once, concurrently"""
+        await asyncio.gather(*[self._run_check(name, probe) for name, probe in self.checks.items()])
+
+    def is_healthy(self, name: str) -> bool:
+        """Last known status of a dependency, True until it has been probed"""
+        status = self.status.get(name)
+        return status is None or status["healthy"]
+
+    def report(self) -> dict:
+        return {
+            "status": "ok" if all(s["healthy"] for s in self.status.values()) else "degraded",
+            "checks": {name: self.status.get(name, {"healthy": None}) for name in self.checks}
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Health check round failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Returns the shared health monitor"""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor(
+            interval_seconds=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+            timeout_seconds=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        )
+    return _health_monitor
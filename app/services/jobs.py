@@ -0,0 +1,438 @@
+"""Background job queue for research runs"""
+
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from app.config import settings
+from app.utils.metrics import trace_run, record_audio_bytes, RUNS
+from app.services.services import generate_podcast_audio_async, stream_podcast_audio, stream_podcast_turns
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when the research queue has no room for another run"""
+
+
+class ResearchJob:
+    """
+    State of a single research run, keyed by its graph thread_id.
+    
+    Besides the progress summary, the job keeps an ordered log of events (node progress,
+    finished interview sections, report parts) that subscribers can replay and follow live.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.status = self.QUEUED
+        self.current_node = None
+        self.completed_nodes = []
+        self.error = None
+        self.report = None
+        self.podcast_script = None
+        self.has_audio = False
+        self.audio_streaming = False
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        # Set for a run executing in another worker process, known only from its checkpoint
+        self.remote = False
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    def publish(self, event: str, data: dict):
+        """Append an event to the log and wake up all subscribers"""
+        self.events.append({"event": event, "data": data})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self, keepalive: Optional[float] = None):
+        """
+        Yield every event from the start of the run until the job finishes.
+        
+        If keepalive is set, None is yielded whenever no event arrived for that many
+        seconds so callers can keep idle connections open.
+        """
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    def to_dict(self) -> dict:
+        """Serializable progress summary (without the report or audio payloads)"""
+        return {
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "current_node": self.current_node,
+            "completed_nodes": list(self.completed_nodes),
+            "error": self.error,
+            "has_audio": self.has_audio,
+            "remote": self.remote,
+            "audio_stream_url": f"/audio/{self.thread_id}/live" if self.audio_streaming else None,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    """
+    Runs approved research graphs on a bounded pool of worker tasks.
+    
+    Approving analysts only enqueues the run, so the HTTP request returns immediately;
+    at most max_workers graphs (and their podcast synthesis) execute at once and at most
+    max_queued runs wait for a free worker. graph is the app's LazyResearchGraph, which is
+    only built (off the event loop) when a job first needs it.
+    
+    With a janitor, every job's status is also recorded in the janitor's shared table under
+    this manager's owner id and kept alive by a heartbeat. Any worker can then report the
+    status of runs executing elsewhere, and queued or running jobs whose owner stopped
+    heartbeating (e.g. after a restart) are claimed by another worker and resumed from
+    their checkpoint.
+    """
+
+    # Statuses of jobs that still need a worker
+    ACTIVE = (ResearchJob.QUEUED, ResearchJob.RUNNING)
+
+    def __init__(self, graph, audio_store, max_workers: int = 2, max_queued: int = 50, history_limit: int = 100, janitor=None):
+        self.graph = graph
+        self.audio_store = audio_store
+        self.janitor = janitor
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history_limit = history_limit
+        self.jobs = OrderedDict()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue = None
+        self._workers = []
+        self._heartbeat = None
+
+    async def start(self):
+        """Start the worker pool; must be called from the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+        if self.janitor is not None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Started {self.max_workers} research workers")
+
+    async def stop(self):
+        """Cancel the worker pool"""
+        tasks = self._workers + ([self._heartbeat] if self._heartbeat else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat = None
+
+    def get(self, thread_id: str) -> Optional[ResearchJob]:
+        return self.jobs.get(thread_id)
+
+    def has_room(self) -> bool:
+        """Whether the queue can take another run right now"""
+        return self._queue is not None and not self._queue.full()
+
+    async def lookup(self, thread_id: str) -> Optional[ResearchJob]:
+        """
+        Return the job for thread_id, rebuilding it from the shared job status and the
+        checkpoint if the run happened in another worker or before a restart.
+        
+        A run that isn't in this process is reported as a remote job with the status its
+        owner recorded, so it only shows as completed once its audio has been stored. Its
+        progress events live in the worker running it, so only its status can be polled here.
+        If the owner stops heartbeating, another worker resumes the run (see
+        _recover_stale_jobs) and the status keeps following it.
+        """
+        job = self.jobs.get(thread_id)
+        if job is not None:
+            return job
+
+        graph = await self.graph.aget()
+        state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+        if not state:
+            return None
+        record = await self.janitor.job_status(thread_id) if self.janitor is not None else None
+        if record is not None:
+            return self._remote_job(thread_id, record, state)
+        if state.next:
+            if "human_feedback" in state.next:
+                # Still waiting for the analysts to be approved
+                return None
+            job = ResearchJob(thread_id)
+            job.current_node = state.next[0]
+            job.remote = True
+            errors = [str(task.error) for task in state.tasks if getattr(task, "error", None)]
+            if errors:
+                # The run stopped at a failed node, e.g. a failed job dropped from history
+                job.status = ResearchJob.FAILED
+                job.error = errors[0]
+                job.publish(job.status, job.to_dict())
+            else:
+                job.status = ResearchJob.RUNNING
+            return job
+        if not state.values.get('final_report'):
+            return None
+        if state.values.get('podcast_script') and not self.audio_store.exists(thread_id):
+            # Without a recorded status, assume the podcast audio is still being synthesized
+            job = ResearchJob(thread_id)
+            job.current_node = "generate_audio"
+            job.remote = True
+            job.status = ResearchJob.RUNNING
+            return job
+
+        job = ResearchJob(thread_id)
+        job.report = state.values.get('final_report')
+        job.podcast_script = state.values.get('podcast_script')
+        job.has_audio = self.audio_store.exists(thread_id)
+        job.status = ResearchJob.COMPLETED
+        job.publish(job.status, job.to_dict())
+        return job
+
+    def _remote_job(self, thread_id: str, record: dict, state) -> ResearchJob:
+        """Build the job of a run owned by another worker from its recorded status and checkpoint"""
+        job = ResearchJob(thread_id)
+        job.remote = True
+        job.status = record["status"]
+        job.error = record["error"]
+        if job.status == ResearchJob.COMPLETED:
+            job.report = state.values.get('final_report')
+            job.podcast_script = state.values.get('podcast_script')
+            job.has_audio = self.audio_store.exists(thread_id)
+        elif not job.done:
+            job.current_node = state.next[0] if state.next else "generate_audio"
+        if job.done:
+            job.publish(job.status, job.to_dict())
+        return job
+
+    async def enqueue(self, thread_id: str) -> ResearchJob:
+        """Queue a research run for thread_id, returning the existing job if one is active"""
+        job = self.jobs.get(thread_id)
+        if job is not None and not job.done:
+            return job
+
+        job = ResearchJob(thread_id)
+        if not self.has_room():
+            raise JobQueueFull(f"Research queue is full ({self.max_queued} runs waiting)")
+        # Recorded before the job is queued, so a worker can't record it running first
+        await self._record(job)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Research queue is full ({self.max_queued} runs waiting)")
+
+        self.jobs[thread_id] = job
+        self.jobs.move_to_end(thread_id)
+        self._evict_finished()
+        logger.info(f"Queued research run for thread {thread_id}")
+        return job
+
+    async def reject(self, thread_id: str, error: str):
+        """Record a run that was approved but could not be queued as failed"""
+        if self.janitor is not None:
+            await self.janitor.set_job_status(thread_id, ResearchJob.FAILED, self.owner, error)
+
+    async def _record(self, job: ResearchJob):
+        """Record the job's status in the shared table, if there is one"""
+        if self.janitor is None:
+            return
+        try:
+            await self.janitor.set_job_status(job.thread_id, job.status, self.owner, job.error)
+        except Exception as e:
+            logger.error(f"Error recording status of thread {job.thread_id}: {str(e)}")
+
+    async def _heartbeat_loop(self):
+        """Keep this worker's jobs alive in the shared table and resume jobs abandoned by others"""
+        while True:
+            try:
+                active = [thread_id for thread_id, job in self.jobs.items() if not job.done]
+                await self.janitor.heartbeat(self.owner, active)
+                await self._recover_stale_jobs()
+            except Exception as e:
+                logger.error(f"Error during job heartbeat: {str(e)}", exc_info=True)
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+
+    async def _recover_stale_jobs(self):
+        """
+        Claim queued or running jobs whose owner stopped heartbeating and queue them here.
+        
+        Only as many jobs as the queue has room for are claimed; the run continues from the
+        last checkpoint of its thread.
+        """
+        limit = self.max_queued - self._queue.qsize()
+        claimed = await self.janitor.claim_stale_jobs(self.owner, self.ACTIVE, settings.JOB_STALE_SECONDS, limit)
+        for thread_id in claimed:
+            logger.warning(f"Resuming research run for thread {thread_id} abandoned by its worker")
+            try:
+                await self.enqueue(thread_id)
+            except JobQueueFull as e:
+                # Not heartbeated here, so it goes stale again and is claimed once there is room
+                logger.error(f"Could not resume thread {thread_id}: {str(e)}")
+
+    def _evict_finished(self):
+        """Forget the oldest finished jobs beyond history_limit"""
+        finished = [tid for tid, job in self.jobs.items() if job.done]
+        for thread_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self.jobs[thread_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._traced_run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _traced_run(self, job: ResearchJob):
+        """Run the job with its own RunTrace, so every node and external call it makes is recorded"""
+        with trace_run(job.thread_id) as trace:
+            await self._run(job)
+        RUNS.inc(status=job.status)
+        slowest = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in list(trace.totals().items())[:5])
+        logger.info(f"Thread {job.thread_id} - run {job.status}, most time spent in: {slowest}")
+        if settings.METRICS_TRACE_DIR:
+            try:
+                path = await asyncio.to_thread(trace.dump, settings.METRICS_TRACE_DIR)
+                logger.info(f"Thread {job.thread_id} - trace written to {path}")
+            except Exception as e:
+                logger.error(f"Error writing trace for thread {job.thread_id}: {str(e)}")
+
+    async def _run(self, job: ResearchJob):
+        thread = {"configurable": {"thread_id": job.thread_id}}
+        job.status = ResearchJob.RUNNING
+        job.started_at = datetime.now()
+        await self._record(job)
+        streaming = settings.PODCAST_STREAMING and settings.PODCAST_ASSEMBLY_MODE == "frames"
+        # Podcast lines emitted by write_podcast while the rest of the graph is still running
+        script_lines = asyncio.Queue()
+        synthesis = None
+        try:
+            graph = await self.graph.aget()
+            state = await graph.aget_state(thread)
+            analysts = state.values.get('analysts', [])
+
+            async for mode, chunk in graph.astream(None, thread, stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    line = chunk.get("podcast_line") if isinstance(chunk, dict) else None
+                    if line and streaming:
+                        if synthesis is None:
+                            # Start speech synthesis with the first line of the script
+                            self._publish_audio_started(job)
+                            synthesis = asyncio.ensure_future(self._stream_audio(
+                                job, stream_podcast_turns(self._queued_lines(script_lines), analysts)
+                            ))
+                        script_lines.put_nowait(line)
+                    continue
+
+                for node, values in chunk.items():
+                    logger.info(f"Thread {job.thread_id} - processing node: {node}")
+                    job.current_node = node
+                    job.completed_nodes.append(node)
+                    job.publish("node", {"node": node, "step": len(job.completed_nodes)})
+                    self._publish_report_parts(job, values)
+            script_lines.put_nowait(None)
+
+            final_state = await graph.aget_state(thread)
+            job.report = final_state.values.get('final_report')
+            job.podcast_script = final_state.values.get('podcast_script')
+
+            if synthesis is not None:
+                audio = await synthesis
+            elif job.podcast_script:
+                self._publish_audio_started(job)
+                audio = await self._synthesize(job, analysts, streaming)
+            else:
+                audio = None
+            if audio:
+                record_audio_bytes("podcast", len(audio))
+                await self.audio_store.save(job.thread_id, audio)
+                job.has_audio = True
+            job.completed_nodes.append("generate_audio")
+            job.status = ResearchJob.COMPLETED
+        except Exception as e:
+            logger.error(f"Research run for thread {job.thread_id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            job.status = ResearchJob.FAILED
+        finally:
+            if synthesis is not None and not synthesis.done():
+                synthesis.cancel()
+            # The live stream stays available until the finished file has been stored
+            self.audio_store.close_live(job.thread_id)
+            job.audio_streaming = False
+            job.finished_at = datetime.now()
+            await self._record(job)
+            job.publish(job.status, job.to_dict())
+            if self.janitor is not None:
+                await self.janitor.touch(job.thread_id)
+
+    @staticmethod
+    def _publish_audio_started(job: ResearchJob):
+        job.current_node = "generate_audio"
+        job.publish("node", {"node": "generate_audio", "step": len(job.completed_nodes) + 1})
+
+    @staticmethod
+    async def _queued_lines(queue: asyncio.Queue):
+        """Yield lines from the queue until the None sentinel"""
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+            yield line
+
+    async def _synthesize(self, job: ResearchJob, analysts: list, streaming: bool):
+        """Synthesize a finished podcast script, streaming each turn to live listeners when enabled"""
+        if not streaming:
+            return await generate_podcast_audio_async(job.podcast_script, analysts)
+        return await self._stream_audio(job, stream_podcast_audio(job.podcast_script, analysts))
+
+    async def _stream_audio(self, job: ResearchJob, turns):
+        """Collect synthesized turns into the episode while serving them to live listeners"""
+        live = self.audio_store.open_live(job.thread_id)
+        try:
+            async for turn in turns:
+                live.append(turn)
+                if not job.audio_streaming:
+                    job.audio_streaming = True
+                    job.publish("audio_stream", {"url": f"/audio/{job.thread_id}/live"})
+            return live.getvalue() or None
+        except Exception as e:
+            logger.error(f"Error streaming podcast audio for thread {job.thread_id}: {str(e)}", exc_info=True)
+            return None
+        finally:
+            live.finish()
+
+    @staticmethod
+    def _publish_report_parts(job: ResearchJob, values):
+        """Publish interview sections and report parts contained in a node update"""
+        if not isinstance(values, dict):
+            return
+        for section in values.get("sections") or []:
+            job.publish("section", {"content": section})
+        for key in ("introduction", "content", "conclusion"):
+            if values.get(key):
+                job.publish(key, {"content": values[key]})
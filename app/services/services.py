@@ -1,25 +1,32 @@
 """Contains various non-agentic services like TTS or SST"""
 
 
-from openai import AsyncOpenAI
 from app.config import settings
+from app.services.clients import get_async_openai_client
+from app.utils.rate_limit import AsyncTokenBucket
+from app.utils.cache import DiskCache, make_cache_key
+from app.utils.mp3 import Mp3Stream, join_mp3
+from app.utils.metrics import timed, record_cache, record_audio_bytes
 import logging
-from pydub import AudioSegment
 from io import BytesIO
 import re
 import asyncio
+import random
+from typing import Optional
 
 
 logger = logging.getLogger(__name__)
 
 
-def split_by_speaker(text, analysts):
+def split_by_speaker(text, analysts, voices=None):
    """Split podcast script into segments by speaker, including gender info"""
    segments = []
    pattern = r'(?:^|\n)\[([^:\]]+)\]:\s*([^\n]+)'
    matches = re.finditer(pattern, text)
   
    analyst_genders = {analyst.name: analyst.gender for analyst in analysts}
+   if voices is None:
+       voices = VoiceAllocator(analysts)
   
    for match in matches:
        speaker = match.group(1).strip()
@@ -27,7 +34,7 @@ def split_by_speaker(text, analysts):
        gender = analyst_genders.get(speaker)
       
        # Get full voice configuration
-       voice_config = get_voice_for_role(speaker, gender)
+       voice_config = voices.voice_for(speaker, gender)
       
        segments.append({
            'speaker': speaker,
@@ -62,94 +69,257 @@ def chunk_text(text, chunk_size=4000):
    return chunks
 
 
-def get_voice_for_role(role, gender=None):
-    """Return voice configuration based on role and gender"""
-    
-    # Voice configurations
-    voice_settings = {
-        'shimmer': {'instructions': "Speak in a professional, broadcast style"},
-        'onyx': {'instructions': "Speak with authority and gravitas"},
-        'echo': {'instructions': "Speak naturally and conversationally"},
-        'ash': {'instructions': "Speak clearly and precisely"},
-        'nova': {'instructions': "Speak with warmth and engagement"},
-        'fable': {'instructions': "Speak with energy and enthusiasm"},
-        'coral': {'instructions': "Speak thoughtfully and with clarity, you choose your words carefully"}
-    }
+# Voice configurations
+VOICE_SETTINGS = {
+    'shimmer': {'instructions': "Speak in a professional, broadcast style"},
+    'onyx': {'instructions': "Speak with authority and gravitas"},
+    'echo': {'instructions': "Speak naturally and conversationally"},
+    'ash': {'instructions': "Speak clearly and precisely"},
+    'nova': {'instructions': "Speak with warmth and engagement"},
+    'fable': {'instructions': "Speak with energy and enthusiasm"},
+    'coral': {'instructions': "Speak thoughtfully and with clarity, you choose your words carefully"}
+}
+HOST_VOICE = 'shimmer'
+DEFAULT_VOICE = 'ash'
+# Available voices by gender
+MALE_VOICES = ('onyx', 'echo', 'ash')
+FEMALE_VOICES = ('nova', 'fable', 'coral')
+
+
+class VoiceAllocator:
+    """
+    Assigns a voice to each speaker of a single podcast.
     
-    # Static dictionary to store speaker-voice assignments
-    if not hasattr(get_voice_for_role, 'speaker_voice_mapping'):
-        get_voice_for_role.speaker_voice_mapping = {}
+    Create one allocator per podcast so concurrent jobs never share assignments. Analysts are
+    assigned up front in the order they were created, so the same cast always gets the same
+    voices no matter who speaks first; once a gender's voices are used up they are reused in
+    the same order.
     
-    # If this speaker already has a voice assigned, use it
-    if role in get_voice_for_role.speaker_voice_mapping:
-        voice = get_voice_for_role.speaker_voice_mapping[role]
+    Args:
+        analysts: Analysts taking part in the podcast
+    """
+
+    def __init__(self, analysts: Optional[list] = None):
+        self.mapping = {}
+        self._counts = {'male': 0, 'female': 0}
+        for analyst in analysts or []:
+            self.voice_for(analyst.name, analyst.gender)
+
+    def _select(self, role: str, gender: Optional[str]) -> str:
+        if 'host' in role.lower():
+            return HOST_VOICE
+        gender = (gender or '').lower()
+        pool = {'male': MALE_VOICES, 'female': FEMALE_VOICES}.get(gender)
+        if pool is None:
+            return DEFAULT_VOICE
+        voice = pool[self._counts[gender] % len(pool)]
+        self._counts[gender] += 1
+        return voice
+
+    def voice_for(self, role: str, gender: Optional[str] = None) -> dict:
+        """Return voice configuration based on role and gender"""
+        if role not in self.mapping:
+            self.mapping[role] = self._select(role, gender)
+        voice = self.mapping[role]
         return {
             'voice': voice,
-            'instructions': voice_settings[voice]['instructions']
+            'instructions': VOICE_SETTINGS[voice]['instructions']
         }
+
+
+class TTSEngine:
+    """
+    Text-to-speech client shared by every podcast synthesis.
     
-    # Available voices by gender
-    male_voices = ['onyx', 'echo', 'ash']
-    female_voices = ['nova', 'fable', 'coral']
-    
-    # Get the voice
-    selected_voice = None
-    
-    if 'host' in role.lower():
-        selected_voice = 'shimmer'
-    elif gender:
-        gender = gender.lower()
-        if gender == 'male':
-            # Count how many male voices are already assigned
-            used_male_count = sum(1 for v in get_voice_for_role.speaker_voice_mapping.values() 
-                                if v in male_voices)
-            selected_voice = male_voices[used_male_count]
-        elif gender == 'female':
-            # Count how many female voices are already assigned
-            used_female_count = sum(1 for v in get_voice_for_role.speaker_voice_mapping.values() 
-                                  if v in female_voices)
-            selected_voice = female_voices[used_female_count]
-    
-    if not selected_voice:
-        selected_voice = 'ash'
-    
-    # Store the voice assignment
-    get_voice_for_role.speaker_voice_mapping[role] = selected_voice
+    The shared AsyncOpenAI client is reused for all requests. A semaphore caps the number of
+    in-flight requests, a token bucket keeps the request rate under the provider limit,
+    and transient failures (rate limits, timeouts, 5xx) are retried with jittered
+    exponential backoff, honouring Retry-After when the provider sends it.
     
-    # Return complete voice settings
-    return {
-        'voice': selected_voice,
-        'instructions': voice_settings[selected_voice]['instructions']
-    }
+    With a cache, synthesized chunks are stored by (model, voice, instructions, text), so
+    repeated lines (e.g. the host's standard intro) are only paid for once, and identical
+    chunks requested concurrently share a single request.
+    """
+
+    def __init__(self, client=None, model="tts-1", max_concurrency=8, requests_per_minute=50,
+                 max_retries=4, backoff_base=0.5, backoff_max=20.0, cache=None):
+        self._client = client
+        self.model = model
+        self.cache = cache
+        self._inflight = {}
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Allow an initial burst of one request per concurrency slot, then the steady rate
+        self.rate_limiter = AsyncTokenBucket(rate=requests_per_minute / 60, capacity=max_concurrency)
+        self._semaphore = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Retries are handled here so they respect the concurrency and rate limits
+            self._client = get_async_openai_client().with_options(max_retries=0)
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+        if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter: spread retries so concurrent chunks don't retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def synthesize(self, text: str, voice="shimmer", instructions="") -> bytes:
+        """Convert text to speech, serving repeated chunks from the cache"""
+        if self.cache is None:
+            return await self._request(text, voice, instructions)
+
+        key = make_cache_key("tts", self.model, voice, instructions, text)
+        audio = await asyncio.to_thread(self.cache.get, key)
+        record_cache("tts", audio is not None)
+        if audio is not None:
+            return audio
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_and_store(key, text, voice, instructions))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _request_and_store(self, key: str, text: str, voice: str, instructions: str) -> bytes:
+        audio = await self._request(text, voice, instructions)
+        await asyncio.to_thread(self.cache.set, key, audio)
+        return audio
+
+    async def _request(self, text: str, voice: str, instructions: str) -> bytes:
+        """Call the TTS API, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    await self.rate_limiter.acquire()
+                    with timed("tts", self.model, voice=voice, characters=len(text)):
+                        response = await self.client.audio.speech.create(
+                            model=self.model,
+                            voice=voice,
+                            input=text,
+                            instructions=instructions
+                        )
+                    record_audio_bytes("tts_chunk", len(response.content))
+                    return response.content
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning(f"TTS request failed ({str(e)}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+_tts_engine = None
+
+
+def get_tts_engine() -> TTSEngine:
+    """Returns the shared TTS engine"""
+    global _tts_engine
+    if _tts_engine is None:
+        _tts_engine = TTSEngine(
+            model=settings.TTS_MODEL,
+            max_concurrency=settings.TTS_MAX_CONCURRENCY,
+            requests_per_minute=settings.TTS_REQUESTS_PER_MINUTE,
+            max_retries=settings.TTS_MAX_RETRIES,
+            cache=DiskCache(settings.TTS_CACHE_PATH, max_bytes=settings.TTS_CACHE_MAX_BYTES) if settings.TTS_CACHE_ENABLED else None
+        )
+    return _tts_engine
 
 
 async def text_to_speech_async(text: str, voice="shimmer", instructions="") -> bytes:
    """Convert text to speech using OpenAI's API asynchronously"""
    try:
-       client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-       response = await client.audio.speech.create(
-           model="tts-1",
-           voice=voice,
-           input=text,
-           instructions=instructions
-       )
-       return response.content
+       return await get_tts_engine().synthesize(text, voice, instructions)
    except Exception as e:
        logger.error(f"Error in text-to-speech: {str(e)}", exc_info=True)
        raise
 
 
+# Pauses between chunks of one speaker turn, and between speaker turns
+CHUNK_GAP_MS = 100
+SEGMENT_GAP_MS = 250
+
+
+def assemble_podcast_audio(segment_audios: list, mode: Optional[str] = None) -> bytes:
+    """
+    Combine per-segment lists of MP3 chunks into one episode with natural pauses.
+    
+    The "frames" mode concatenates MP3 frames and pre-encoded silence in linear time without
+    decoding or re-encoding; it falls back to pydub if the chunks can't be joined directly.
+    """
+    segment_audios = [chunks for chunks in segment_audios if chunks]
+    if not segment_audios:
+        return None
+
+    mode = mode or settings.PODCAST_ASSEMBLY_MODE
+    if mode == "frames":
+        try:
+            segments = [join_mp3(chunks, gap_ms=CHUNK_GAP_MS) for chunks in segment_audios]
+            return join_mp3(segments, gap_ms=SEGMENT_GAP_MS)
+        except ValueError as e:
+            logger.warning(f"Falling back to pydub for podcast assembly: {str(e)}")
+    return _assemble_with_pydub(segment_audios)
+
+
+def _assemble_with_pydub(segment_audios: list) -> bytes:
+    """Decode, concatenate and re-encode the chunks with pydub"""
+    from pydub import AudioSegment
+
+    combined_audio = None
+    for segment_chunks in segment_audios:
+        segment_audio = None
+       
+        # Combine chunks for this segment
+        for chunk_audio in segment_chunks:
+            audio_segment = AudioSegment.from_mp3(BytesIO(chunk_audio))
+            if segment_audio is None:
+                segment_audio = audio_segment
+            else:
+                segment_audio += AudioSegment.silent(duration=CHUNK_GAP_MS) + audio_segment
+       
+        # Add to main audio
+        if combined_audio is None:
+            combined_audio = segment_audio
+        else:
+            combined_audio += AudioSegment.silent(duration=SEGMENT_GAP_MS) + segment_audio
+   
+    output = BytesIO()
+    combined_audio.export(output, format="mp3")
+    return output.getvalue()
+
+
 async def generate_podcast_audio_async(podcast: str, analysts: list) -> bytes:
    """Generate podcast audio from text script and analyst information."""
    if not podcast:
        return None
       
    try:
-       # Clear the voice mapping before generating a new podcast
-       if hasattr(get_voice_for_role, 'speaker_voice_mapping'):
-           get_voice_for_role.speaker_voice_mapping.clear()
-           
-       segments = split_by_speaker(podcast, analysts)
+       segments = split_by_speaker(podcast, analysts, VoiceAllocator(analysts))
        all_tasks = []
        segment_lengths = []  # Keep track of number of chunks per segment
       
@@ -167,39 +337,93 @@ async def generate_podcast_audio_async(podcast: str, analysts: list) -> bytes:
                    )
                )
       
-       # Process everything in parallel
+       # Process everything in parallel, bounded by the TTS engine's limits
        all_chunk_audios = await asyncio.gather(*all_tasks)
       
-       # Reconstruct the audio in correct order
-       combined_audio = None
+       # Regroup the chunk audio by segment, in script order
+       segment_audios = []
        chunk_index = 0
-      
        for num_chunks in segment_lengths:
-           # Get this segment's chunks
-           segment_chunks = all_chunk_audios[chunk_index:chunk_index + num_chunks]
-           segment_audio = None
-          
-           # Combine chunks for this segment
-           for chunk_audio in segment_chunks:
-               audio_segment = AudioSegment.from_mp3(BytesIO(chunk_audio))
-               if segment_audio is None:
-                   segment_audio = audio_segment
-               else:
-                   segment_audio += AudioSegment.silent(duration=100) + audio_segment
-          
-           # Add to main audio
-           if combined_audio is None:
-               combined_audio = segment_audio
-           else:
-               combined_audio += AudioSegment.silent(duration=250) + segment_audio
-          
+           segment_audios.append(all_chunk_audios[chunk_index:chunk_index + num_chunks])
            chunk_index += num_chunks
       
-       if combined_audio:
-           output = BytesIO()
-           combined_audio.export(output, format="mp3")
-           return output.getvalue()
-       return None
+       # Assembly is CPU-bound in pydub mode, so keep it off the event loop
+       return await asyncio.to_thread(assemble_podcast_audio, segment_audios)
    except Exception as e:
        logger.error(f"Error generating podcast audio: {str(e)}")
-       return None
\ No newline at end of file
+       return None
+
+
+async def _synthesize_segment(segment: dict) -> list:
+    """Synthesize every chunk of one speaker turn"""
+    return await asyncio.gather(*[
+        text_to_speech_async(chunk, segment['voice'], segment['instructions'])
+        for chunk in chunk_text(segment['content'])
+    ])
+
+
+async def stream_podcast_audio(podcast: str, analysts: list):
+    """
+    Yield the podcast as MP3 frames one speaker turn at a time, in script order.
+    
+    All turns are queued for synthesis up front (bounded by the TTS engine), and each
+    turn is yielded as soon as it and every turn before it are ready, so playback can
+    start after a single TTS round trip while later turns are still being generated.
+    
+    Raises:
+        ValueError: If the synthesized chunks can't be joined at the frame level
+    """
+    if not podcast:
+        return
+
+    async def script_lines():
+        for line in podcast.split("\n"):
+            yield line
+
+    async for turn in stream_podcast_turns(script_lines(), analysts):
+        yield turn
+
+
+async def stream_podcast_turns(lines, analysts: list):
+    """
+    Synthesize a podcast script that is still being written and yield each turn's MP3 frames.
+    
+    Each "[Speaker]: text" line from the async iterator is queued for synthesis as soon as it
+    arrives, so speech generation overlaps script generation; turns are yielded in order.
+    
+    Raises:
+        ValueError: If the synthesized chunks can't be joined at the frame level
+    """
+    # One allocator per podcast keeps voices consistent across lines without sharing state between jobs
+    voices = VoiceAllocator(analysts)
+    pending = asyncio.Queue()
+
+    async def schedule():
+        try:
+            async for line in lines:
+                for segment in split_by_speaker(line, analysts, voices):
+                    pending.put_nowait(asyncio.ensure_future(_synthesize_segment(segment)))
+        finally:
+            pending.put_nowait(None)
+
+    scheduler = asyncio.ensure_future(schedule())
+    stream = Mp3Stream()
+    try:
+        while True:
+            task = await pending.get()
+            if task is None:
+                break
+            chunk_audios = await task
+            if not chunk_audios:
+                continue
+            turn = stream.append(chunk_audios[0], SEGMENT_GAP_MS)
+            turn += b"".join(stream.append(chunk, CHUNK_GAP_MS) for chunk in chunk_audios[1:])
+            yield turn
+        # Surface errors from the line source
+        await scheduler
+    finally:
+        scheduler.cancel()
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task is not None:
+                task.cancel()
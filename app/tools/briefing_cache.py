@@ -0,0 +1,107 @@
+"""Stale-while-revalidate cache for the news briefing tool"""
+
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from app.utils.cache import make_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+
+class NewsBriefingCache:
+    """
+    Caches the news briefing together with a fingerprint of the articles it summarizes.
+
+    The cached briefing is returned immediately while a daemon thread, started on first use,
+    re-fetches the headlines every refresh_seconds. The articles are only re-summarized when
+    the fingerprint changes, so an unchanged set of headlines costs one NewsAPI request and
+    no LLM call. A briefing older than max_stale_seconds (e.g. because refreshes keep failing)
+    is refreshed in the caller's thread before it is returned.
+
+    Args:
+        fetch: Returns the current list of articles
+        summarize: Summarizes the articles, or returns None when summaries are unavailable
+        fallback: Builds a briefing without the LLM, served until a summary succeeds
+        refresh_seconds: Time between background refreshes
+        max_stale_seconds: Maximum age of a briefing that is served without refreshing
+    """
+
+    def __init__(self, fetch: Callable[[], List[dict]], summarize: Callable[[List[dict]], Optional[str]],
+                 fallback: Callable[[List[dict]], str], refresh_seconds: int = 900, max_stale_seconds: int = 3600):
+        self.fetch = fetch
+        self.summarize = summarize
+        self.fallback = fallback
+        self.refresh_seconds = refresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        # (fingerprint, briefing, refreshed_at), replaced as a whole on every refresh
+        self._entry = None
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def fingerprint(articles: List[dict]) -> str:
+        return make_cache_key(*[
+            (article.get('url'), article.get('title'), article.get('publishedAt'))
+            for article in articles
+        ])
+
+    def _is_fresh(self, max_age: float) -> bool:
+        entry = self._entry
+        return entry is not None and time.time() - entry[2] <= max_age
+
+    def refresh(self, max_age: Optional[float] = None):
+        """
+        Fetch the headlines and re-summarize them if they changed.
+
+        Args:
+            max_age: Skip the refresh if the briefing is younger than this, e.g. because a
+                concurrent caller refreshed it while this one waited for the lock
+        """
+        with self._refresh_lock:
+            if max_age is not None and self._is_fresh(max_age):
+                return
+            articles = self.fetch()
+            fingerprint = self.fingerprint(articles)
+            entry = self._entry
+            if entry is not None and entry[0] == fingerprint:
+                self._entry = (fingerprint, entry[1], time.time())
+                logger.info("News headlines unchanged, keeping the cached briefing")
+                return
+
+            summary = self.summarize(articles)
+            if summary is None:
+                # No fingerprint, so the next refresh tries to summarize again
+                self._entry = (None, self.fallback(articles), time.time())
+            else:
+                self._entry = (fingerprint, summary, time.time())
+
+    def get(self) -> str:
+        """Return the cached briefing, refreshing first only if there is none or it is too stale"""
+        self._ensure_refresher()
+        if not self._is_fresh(self.max_stale_seconds):
+            self.refresh(max_age=self.max_stale_seconds)
+        return self._entry[1]
+
+    def _ensure_refresher(self):
+        if self._thread is not None:
+            return
+        with self._refresh_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="news-briefing-refresh", daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous briefing
+                logger.error(f"Background news briefing refresh failed: {str(e)}", exc_info=True)
+
+    def stop(self):
+        self._stop.set()
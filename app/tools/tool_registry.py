@@ -1,12 +1,13 @@
 """Tools Registry"""
 
-import requests
 import logging
 import inspect
 from typing import List
-from openai import OpenAI
 from app.config import settings  # Use the existing instance, not the class
-from functools import wraps
+from app.services.clients import get_openai_client, get_http_session
+from app.services.health import get_health_monitor
+from app.tools.briefing_cache import NewsBriefingCache
+from functools import wraps, lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,7 @@ def _fetch_latest_news() -> int:
         }
         
         logger.info(f"Fetching news articles from {url}")
-        response = requests.get(url, params=params)
+        response = get_http_session().get(url, params=params)
         response.raise_for_status()
         articles = response.json()["articles"]
         logger.info(f"Successfully fetched {len(articles)} articles")
@@ -49,7 +50,7 @@ def _fetch_latest_news() -> int:
 def _create_batch_summary(articles: List[dict]) -> str:
     """Creates a summary of the news articles"""
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = get_openai_client()
         
         articles_text = "\n\n".join([
             f"Title: {article['title']}\n"
@@ -89,20 +90,35 @@ def _create_batch_summary(articles: List[dict]) -> str:
         logger.error(f"Error creating summary: {str(e)}", exc_info=True)
         raise
 
-def _test_openai_api():
-    """Function test OpenAI API connection"""
-    try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Say hello"}],
-            max_tokens=10
+def _headlines_briefing(articles: List[dict]) -> str:
+    """Plain list of headlines, used when OpenAI is unavailable"""
+    headlines = "\n".join(f"- {article['title']}" for article in articles)
+    return f"Today's top tech headlines (summary unavailable right now):\n{headlines}"
+
+
+def _summarize_if_healthy(articles: List[dict]):
+    """Summarize the articles, or return None while the health check reports OpenAI as down"""
+    if not get_health_monitor().is_healthy("openai"):
+        logger.warning("OpenAI is unhealthy, returning headlines without a summary")
+        return None
+    return _create_batch_summary(articles)
+
+
+_briefing_cache = None
+
+
+def get_briefing_cache() -> NewsBriefingCache:
+    """Returns the shared news briefing cache"""
+    global _briefing_cache
+    if _briefing_cache is None:
+        _briefing_cache = NewsBriefingCache(
+            fetch=_fetch_latest_news,
+            summarize=_summarize_if_healthy,
+            fallback=_headlines_briefing,
+            refresh_seconds=settings.NEWS_BRIEFING_REFRESH_SECONDS,
+            max_stale_seconds=settings.NEWS_BRIEFING_MAX_STALE_SECONDS
         )
-        logger.info("OpenAI API test successful")
-        return True
-    except Exception as e:
-        logger.error(f"OpenAI API test failed: {str(e)}")
-        return False
+    return _briefing_cache
 
 
 
@@ -117,14 +133,9 @@ def get_news_briefing() -> dict:
     3. Return a formatted briefing
     """
 
-    _test_openai_api()
-
-    articles = _fetch_latest_news()  # Use adjusted count
-
-    summary = _create_batch_summary(articles)
-
-    
-    return summary
+    # Served from the cache, which re-fetches the headlines in the background
+    # and only re-summarizes them when they change
+    return get_briefing_cache().get()
 
 
 
@@ -180,11 +191,15 @@ def search_web_context(user_query: str, topic: str, days: int, search_depth: str
         "Content-Type": "application/json"
     }
 
-    response = requests.request("POST", url, json=payload, headers=headers)
+    response = get_http_session().post(url, json=payload, headers=headers)
 
     return response.text
 
 
+# Tools without side effects, safe to run without human approval (see Agent(auto_approve=...))
+READ_ONLY_TOOLS = frozenset({"get_news_briefing", "search_web_context"})
+
+
 def get_all_tools():
     """Returns all available tools."""
     logger.info("Registering tools...")  # Add this to verify tools are being registered
@@ -195,7 +210,9 @@ def get_all_tools():
     return tools
 
 
+@lru_cache(maxsize=None)
 def function_to_schema(func) -> dict:
+    """Build the OpenAI tool schema of a function (cached per function, treat as read-only)"""
     type_map = {
         str: "string",
         int: "integer",
@@ -0,0 +1,157 @@
+"""
+Compaction of the interview's search context to a token budget.
+
+Search nodes append formatted <Document> blocks to InterviewState.context on every turn,
+so the raw list grows with each question and repeats sources that several searches
+returned. compact_context turns it back into a single prompt-ready string: documents
+are parsed out, deduplicated by source URL, and packed newest first until the token
+budget is spent, truncating the last document that only partly fits.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_DOCUMENT = re.compile(r"<Document(?P<attrs>[^>]*?)/?>\s*(?P<body>.*?)\s*</Document>", re.S)
+_SOURCE = re.compile(r'(?:href|source)="([^"]*)"')
+
+SEPARATOR = "\n\n---\n\n"
+# Don't bother including a truncated document with less room than this
+MIN_TRUNCATED_TOKENS = 100
+
+
+class ContextDocument(NamedTuple):
+    attrs: str
+    body: str
+    source: Optional[str]
+
+    def render(self, body: Optional[str] = None) -> str:
+        return f"<Document{self.attrs}/>\n{self.body if body is None else body}\n</Document>"
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    The model's tokenizer, or None when it isn't available.
+    
+    tiktoken downloads the BPE file on first use, so without network access (or a
+    pre-seeded TIKTOKEN_CACHE_DIR) loading it fails. The None fallback is cached too, so
+    a missing tokenizer costs one warning rather than a failed prompt on every call.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, estimating tokens as characters / 4")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model("gpt-4o-mini")
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"Could not load the tiktoken encoding ({str(e)}), estimating tokens as characters / 4")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _flatten(context: Iterable) -> List[str]:
+    items = []
+    for item in context:
+        if isinstance(item, (list, tuple)):
+            items.extend(_flatten(item))
+        elif item:
+            items.append(str(item))
+    return items
+
+
+def parse_documents(context: Iterable) -> List[ContextDocument]:
+    """
+    Extract the documents from the context list, in order, without duplicates.
+
+    Documents are deduplicated by their href/source URL, or by body when they have none.
+    Entries without any <Document> block (e.g. search error messages) are dropped.
+    """
+    documents = []
+    seen = set()
+    for item in _flatten(context):
+        for match in _DOCUMENT.finditer(item):
+            source = _SOURCE.search(match.group("attrs"))
+            source = source.group(1) if source and source.group(1) else None
+            key = source or match.group("body")
+            if key in seen:
+                continue
+            seen.add(key)
+            documents.append(ContextDocument(match.group("attrs").rstrip(), match.group("body"), source))
+    return documents
+
+
+def pack_documents(documents: List[ContextDocument], budget_tokens: int) -> str:
+    """
+    Render documents in the given priority order until budget_tokens is spent.
+
+    The first document that doesn't fit is truncated if enough room is left for it to be
+    useful; otherwise shorter documents further down may still be included.
+
+    Args:
+        documents: Documents, most important first
+        budget_tokens: Maximum tokens of the rendered context, or 0 for no limit
+
+    Returns:
+        The documents joined by separators, ready to be placed in a prompt
+    """
+    if budget_tokens <= 0:
+        return SEPARATOR.join(document.render() for document in documents)
+
+    rendered = []
+    remaining = budget_tokens
+    separator_tokens = count_tokens(SEPARATOR)
+    for document in documents:
+        text = document.render()
+        tokens = count_tokens(text) + separator_tokens
+        if tokens <= remaining:
+            rendered.append(text)
+            remaining -= tokens
+            continue
+        room = remaining - (tokens - count_tokens(document.body))
+        if room >= MIN_TRUNCATED_TOKENS:
+            rendered.append(document.render(truncate_tokens(document.body, room)))
+            break
+        # Too little room to be useful, but a shorter document further on may still fit
+    if len(rendered) < len(documents):
+        logger.info(f"Compacted context to {len(rendered)} of {len(documents)} documents ({budget_tokens} token budget)")
+    return SEPARATOR.join(rendered)
+
+
+def compact_context(context: Iterable, budget_tokens: int) -> str:
+    """
+    Render the deduplicated context within budget_tokens.
+
+    The most recent documents, which answer the latest question, are kept first.
+
+    Args:
+        context: InterviewState.context, a list of formatted search results
+        budget_tokens: Maximum tokens of the rendered context, or 0 for no limit
+
+    Returns:
+        The documents joined by separators, ready to be placed in a prompt
+    """
+    documents = parse_documents(context)
+    documents.reverse()
+    return pack_documents(documents, budget_tokens)
@@ -2,14 +2,76 @@
 Utility functions for LLM operations with centralized logging and error handling.
 """
 
+import asyncio
 import logging
 import datetime
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumpd
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableBinding, RunnableSequence
 from app.config import settings
+from app.utils.cache import DiskCache, MemoryCache, TieredCache, make_cache_key
+from app.utils.metrics import timed, record_tokens, record_cache
 
 logger = logging.getLogger(__name__)
 
-def invoke_llm(llm, messages, function_name="unknown", **kwargs):
+_llm_cache = None
+
+
+def get_llm_cache():
+    """Returns the shared LLM response cache, or None when LLM_CACHE_ENABLED is off"""
+    global _llm_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = TieredCache(
+            MemoryCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS),
+            DiskCache(settings.LLM_CACHE_PATH, max_bytes=settings.LLM_CACHE_MAX_BYTES, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
+        )
+    return _llm_cache
+
+
+def _llm_fingerprint(llm):
+    """
+    Describe a chat model or structured-output chain by its model, parameters and bound
+    kwargs (tool / response-format schemas), without client objects or memory addresses.
+    """
+    if isinstance(llm, RunnableSequence):
+        return [_llm_fingerprint(step) for step in llm.steps]
+    if isinstance(llm, RunnableBinding):
+        return {"bound": _llm_fingerprint(llm.bound), "kwargs": llm.kwargs}
+    if isinstance(llm, BaseChatModel):
+        return {"type": llm._llm_type, "params": llm._identifying_params}
+    return f"{type(llm).__module__}.{type(llm).__qualname__}"
+
+
+def llm_cache_key(llm, messages, **kwargs) -> str:
+    """Content-addressed key for an LLM call"""
+    return make_cache_key(_llm_fingerprint(llm), dumpd(messages), kwargs)
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Records the prompt and completion tokens of every model response, including structured output"""
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    record_tokens(self.function_name, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+def _with_usage_callback(kwargs: dict, function_name: str) -> dict:
+    """Add the token usage callback to the invoke kwargs"""
+    config = dict(kwargs.get("config") or {})
+    config["callbacks"] = list(config.get("callbacks") or []) + [TokenUsageCallback(function_name)]
+    return {**kwargs, "config": config}
+
+
+def invoke_llm(llm, messages, function_name="unknown", use_cache=True, **kwargs):
     """
     Wrapper function for LLM calls with centralized logging and error handling.
     
@@ -17,16 +79,30 @@ def invoke_llm(llm, messages, function_name="unknown", **kwargs):
         llm: The LLM instance to use
         messages: List of messages to send to the LLM
         function_name: Name of the calling function for logging
+        use_cache: Whether to consult the LLM response cache (when LLM_CACHE_ENABLED is set)
         **kwargs: Additional arguments to pass to the LLM invoke method
         
     Returns:
         The LLM response or a default error response
     """
     try:
+        cache = get_llm_cache() if use_cache else None
+        if cache is not None:
+            cache_key = llm_cache_key(llm, messages, **kwargs)
+            response = cache.get(cache_key)
+            record_cache("llm", response is not None)
+            if response is not None:
+                logger.info(f"LLM call from {function_name} served from cache")
+                return response
+
         logger.info(f"LLM call from {function_name} with {len(messages)} messages")
         start_time = datetime.datetime.now()
         
-        response = llm.invoke(messages, **kwargs)
+        with timed("llm", function_name):
+            response = llm.invoke(messages, **_with_usage_callback(kwargs, function_name))
+        
+        if cache is not None:
+            cache.set(cache_key, response)
         
         end_time = datetime.datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -37,3 +113,87 @@ def invoke_llm(llm, messages, function_name="unknown", **kwargs):
         logger.error(f"Error in LLM call from {function_name}: {str(e)}", exc_info=True)
         # Return a default error message that can be handled by the calling function
         return AIMessage(content=f"Error in LLM processing: {str(e)}")
+
+
+async def ainvoke_llm(llm, messages, function_name="unknown", use_cache=True, **kwargs):
+    """
+    Async counterpart of invoke_llm that awaits the LLM without blocking the event loop.
+    
+    Args:
+        llm: The LLM instance to use
+        messages: List of messages to send to the LLM
+        function_name: Name of the calling function for logging
+        use_cache: Whether to consult the LLM response cache (when LLM_CACHE_ENABLED is set)
+        **kwargs: Additional arguments to pass to the LLM ainvoke method
+        
+    Returns:
+        The LLM response or a default error response
+    """
+    try:
+        cache = get_llm_cache() if use_cache else None
+        if cache is not None:
+            cache_key = llm_cache_key(llm, messages, **kwargs)
+            # The disk tier is SQLite, so keep its reads and writes off the event loop
+            response = await asyncio.to_thread(cache.get, cache_key)
+            record_cache("llm", response is not None)
+            if response is not None:
+                logger.info(f"Async LLM call from {function_name} served from cache")
+                return response
+
+        logger.info(f"Async LLM call from {function_name} with {len(messages)} messages")
+        start_time = datetime.datetime.now()
+        
+        with timed("llm", function_name):
+            response = await llm.ainvoke(messages, **_with_usage_callback(kwargs, function_name))
+        
+        if cache is not None:
+            await asyncio.to_thread(cache.set, cache_key, response)
+        
+        end_time = datetime.datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        logger.info(f"Async LLM call from {function_name} completed in {duration:.2f} seconds")
+        
+        return response
+    except Exception as e:
+        logger.error(f"Error in async LLM call from {function_name}: {str(e)}", exc_info=True)
+        # Return a default error message that can be handled by the calling function
+        return AIMessage(content=f"Error in LLM processing: {str(e)}")
+
+
+async def astream_llm_lines(llm, messages, function_name="unknown", **kwargs):
+    """
+    Stream an LLM response and yield it one complete line at a time.
+    
+    Lets callers act on the first lines of a long response (e.g. a podcast script) while
+    the rest is still being generated. Responses are not cached.
+    
+    Args:
+        llm: The LLM instance to use
+        messages: List of messages to send to the LLM
+        function_name: Name of the calling function for logging
+        **kwargs: Additional arguments to pass to the LLM astream method
+        
+    Yields:
+        Each non-empty line of the response, or a default error line if the call fails
+    """
+    try:
+        logger.info(f"Streaming LLM call from {function_name} with {len(messages)} messages")
+        start_time = datetime.datetime.now()
+        
+        pending = ""
+        with timed("llm", function_name):
+            async for chunk in llm.astream(messages, **_with_usage_callback(kwargs, function_name)):
+                pending += chunk.content
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    if line.strip():
+                        yield line
+            if pending.strip():
+                yield pending
+        
+        end_time = datetime.datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        logger.info(f"Streaming LLM call from {function_name} completed in {duration:.2f} seconds")
+    except Exception as e:
+        logger.error(f"Error in streaming LLM call from {function_name}: {str(e)}", exc_info=True)
+        yield f"Error in LLM processing: {str(e)}"
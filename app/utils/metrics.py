@@ -0,0 +1,295 @@
+"""
+In-process metrics exported in the Prometheus text format, plus per-run traces.
+
+Histograms and counters are aggregated by low-cardinality labels (node, operation,
+cache) so they can be scraped from /metrics. Everything measured while a research run
+is active is also recorded as a span on that run's RunTrace, which carries the
+thread_id, so a single run can be broken down afterwards without putting thread ids
+in the metric labels.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+BYTE_BUCKETS = (16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    """Exact bucket bound for the le label (e.g. 16777216, not 1.67772e+07)"""
+    return str(int(bound)) if float(bound).is_integer() else repr(float(bound))
+
+
+class Registry:
+    """Collection of metrics rendered together by /metrics"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: tuple = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._labels(key)} {value}" for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: Registry = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def collect(self) -> list:
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, (('le', _format_bound(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._labels(key, (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+OPERATION_SECONDS = Histogram(
+    "scout_operation_duration_seconds",
+    "Duration of graph nodes and external calls",
+    ["kind", "name"]
+)
+LLM_TOKENS = Histogram(
+    "scout_llm_tokens",
+    "Tokens per LLM call",
+    ["function", "type"],
+    buckets=TOKEN_BUCKETS
+)
+AUDIO_BYTES = Histogram(
+    "scout_audio_bytes",
+    "Size of synthesized TTS chunks and finished podcasts",
+    ["stage"],
+    buckets=BYTE_BUCKETS
+)
+LLM_COST = Counter(
+    "scout_llm_cost_dollars_total",
+    "Estimated LLM spend from token counts and the configured prices",
+    ["function"]
+)
+CACHE_REQUESTS = Counter(
+    "scout_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+RUNS = Counter(
+    "scout_research_runs_total",
+    "Finished research runs by status",
+    ["status"]
+)
+
+
+class RunTrace:
+    """Spans recorded during one research run"""
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.started_at = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, duration: Optional[float] = None, **attributes):
+        span = {
+            "kind": kind,
+            "name": name,
+            "offset_seconds": round(time.time() - self.started_at - (duration or 0), 3),
+        }
+        if duration is not None:
+            span["duration_seconds"] = round(duration, 3)
+        span.update(attributes)
+        with self._lock:
+            self.spans.append(span)
+
+    def totals(self) -> dict:
+        """Total seconds spent per kind and name"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            if "duration_seconds" in span:
+                key = f"{span['kind']}:{span['name']}"
+                totals[key] = round(totals.get(key, 0) + span["duration_seconds"], 3)
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "thread_id": self.thread_id,
+            "started_at": self.started_at,
+            "duration_seconds": round(time.time() - self.started_at, 3),
+            "totals": self.totals(),
+            "spans": spans
+        }
+
+    def dump(self, directory: str) -> str:
+        """Write the trace to <directory>/<thread_id>.json and return the path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.thread_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+_current_trace = contextvars.ContextVar("scout_run_trace", default=None)
+
+
+@contextmanager
+def trace_run(thread_id: str):
+    """Make a new RunTrace current for everything run in this context (including graph nodes)"""
+    trace = RunTrace(thread_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def timed(kind: str, name: str, **attributes):
+    """Observe the duration of the block and record it on the current run's trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        OPERATION_SECONDS.observe(duration, kind=kind, name=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(kind, name, duration, **attributes)
+
+
+def timed_node(name: str, func):
+    """Wrap a graph node (sync or async) so each call is timed as kind="node" """
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_node(*args, **kwargs):
+            with timed("node", name):
+                return await func(*args, **kwargs)
+        return async_node
+
+    @functools.wraps(func)
+    def node(*args, **kwargs):
+        with timed("node", name):
+            return func(*args, **kwargs)
+    return node
+
+
+def record_tokens(function_name: str, prompt_tokens: int, completion_tokens: int):
+    LLM_TOKENS.observe(prompt_tokens, function=function_name, type="prompt")
+    LLM_TOKENS.observe(completion_tokens, function=function_name, type="completion")
+    cost = (prompt_tokens * settings.LLM_PROMPT_PRICE_PER_1M
+            + completion_tokens * settings.LLM_COMPLETION_PRICE_PER_1M) / 1_000_000
+    LLM_COST.inc(cost, function=function_name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record("tokens", function_name, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                     cost_dollars=round(cost, 6))
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record("cache", cache, hit=hit)
+
+
+def record_audio_bytes(stage: str, size: int):
+    AUDIO_BYTES.observe(size, stage=stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record("audio", stage, bytes=size)
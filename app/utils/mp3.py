@@ -0,0 +1,208 @@
+"""
+Frame-level MP3 helpers for joining audio without decoding and re-encoding it.
+
+Only MPEG Layer III streams are supported, which is what the TTS provider returns.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Bitrates in kbps indexed by the header's bitrate index, for Layer III
+_BITRATES = {
+    "mpeg1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "mpeg2": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates indexed by the header's version bits, then its sample rate index
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+_LAYER_III = 1
+
+
+class FrameFormat(NamedTuple):
+    """Stream parameters of a Layer III frame that must match across joined chunks"""
+    version: int
+    bitrate_index: int
+    sample_rate_index: int
+    channel_byte: int
+
+    @property
+    def mpeg1(self) -> bool:
+        return self.version == 3
+
+    @property
+    def mono(self) -> bool:
+        return (self.channel_byte >> 6) == 3
+
+    @property
+    def sample_rate(self) -> int:
+        return _SAMPLE_RATES[self.version][self.sample_rate_index]
+
+    @property
+    def bitrate(self) -> int:
+        return _BITRATES["mpeg1" if self.mpeg1 else "mpeg2"][self.bitrate_index] * 1000
+
+    @property
+    def samples_per_frame(self) -> int:
+        return 1152 if self.mpeg1 else 576
+
+    @property
+    def side_info_size(self) -> int:
+        if self.mpeg1:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+    def frame_length(self, padding: int = 0) -> int:
+        return (144 if self.mpeg1 else 72) * self.bitrate // self.sample_rate + padding
+
+
+def _parse_header(data: bytes, offset: int):
+    """Return (format, frame length, has CRC) for a Layer III frame header at offset, or None"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != _LAYER_III or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    frame_format = FrameFormat(version, bitrate_index, sample_rate_index, b3)
+    padding = (b2 >> 1) & 0x01
+    has_crc = not (b1 & 0x01)
+    return frame_format, frame_format.frame_length(padding), has_crc
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _is_info_frame(data: bytes, offset: int, frame_format: FrameFormat, has_crc: bool) -> bool:
+    """Whether the frame is a Xing/Info/VBRI header rather than audio"""
+    tag_offset = offset + 4 + (2 if has_crc else 0) + frame_format.side_info_size
+    return data[tag_offset:tag_offset + 4] in (b"Xing", b"Info") or data[offset + 36:offset + 40] == b"VBRI"
+
+
+def extract_frames(data: bytes) -> Tuple[bytes, FrameFormat]:
+    """
+    Strip ID3 tags and Xing/Info headers from an MP3 file and return its raw audio frames.
+    
+    Args:
+        data: A complete Layer III MP3 file
+        
+    Returns:
+        The concatenated audio frames and the format of the first one
+        
+    Raises:
+        ValueError: If no Layer III frames are found or the stream changes format
+    """
+    offset = _skip_id3v2(data)
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+    stream_format = None
+    spans = []
+
+    while offset + 4 <= end:
+        header = _parse_header(data, offset)
+        if header is None:
+            # Resynchronise on the next frame sync word
+            offset = data.find(b"\xff", offset + 1, end)
+            if offset < 0:
+                break
+            continue
+
+        frame_format, length, has_crc = header
+        if offset + length > end:
+            break
+        if stream_format is None:
+            stream_format = frame_format
+        else:
+            check_compatible(stream_format, frame_format)
+
+        if not _is_info_frame(data, offset, frame_format, has_crc):
+            if spans and spans[-1][1] == offset:
+                spans[-1][1] = offset + length
+            else:
+                spans.append([offset, offset + length])
+        offset += length
+
+    if stream_format is None:
+        raise ValueError("No MPEG Layer III frames found")
+    return b"".join(data[start:stop] for start, stop in spans), stream_format
+
+
+@lru_cache(maxsize=64)
+def silence_frames(frame_format: FrameFormat, duration_ms: int) -> bytes:
+    """
+    Pre-encoded silence matching frame_format, rounded to whole frames.
+    
+    Each frame has an all-zero side info block (no main data, zero gain), which every
+    decoder renders as digital silence without needing an encoder.
+    """
+    frames = max(1, round(duration_ms * frame_format.sample_rate / 1000 / frame_format.samples_per_frame))
+    version_layer = 0xE0 | (frame_format.version << 3) | (_LAYER_III << 1) | 0x01  # no CRC
+    rate_byte = (frame_format.bitrate_index << 4) | (frame_format.sample_rate_index << 2)  # no padding
+    header = bytes((0xFF, version_layer, rate_byte, frame_format.channel_byte))
+    frame = header + bytes(frame_format.frame_length() - len(header))
+    return frame * frames
+
+
+class Mp3Stream:
+    """
+    Incrementally joins MP3 files into one stream, emitting each part's frames as it arrives.
+    
+    Every part must share the sample rate and channel mode of the first one.
+    """
+
+    def __init__(self):
+        self.format = None
+
+    def append(self, part: bytes, gap_ms: int = 0) -> bytes:
+        """
+        Return the frames of part, preceded by gap_ms of silence unless it is the first part.
+        
+        Raises:
+            ValueError: If the part isn't Layer III or doesn't match the stream format
+        """
+        frames, frame_format = extract_frames(part)
+        if self.format is None:
+            self.format = frame_format
+            return frames
+        check_compatible(self.format, frame_format)
+        if gap_ms:
+            return silence_frames(self.format, gap_ms) + frames
+        return frames
+
+
+def join_mp3(parts, gap_ms: int = 0) -> bytes:
+    """
+    Join MP3 files frame by frame, optionally separated by silence.
+    
+    Args:
+        parts: MP3 files to concatenate, in order
+        gap_ms: Silence inserted between consecutive parts
+        
+    Returns:
+        A single MP3 stream
+        
+    Raises:
+        ValueError: If the parts aren't Layer III or don't share a sample rate and channel mode
+    """
+    stream = Mp3Stream()
+    output = bytearray()
+    for part in parts:
+        output += stream.append(part, gap_ms)
+    return bytes(output)
+
+
+def check_compatible(expected: FrameFormat, actual: FrameFormat):
+    """Raise ValueError unless two streams can be concatenated without re-encoding"""
+    if (expected.version, expected.sample_rate_index, expected.mono) != (actual.version, actual.sample_rate_index, actual.mono):
+        raise ValueError("MP3 chunks have different sample rates or channel modes")
@@ -0,0 +1,109 @@
+"""
+Local BM25 ranking of the interview's search results against the current question.
+
+The documents from InterviewState.context are split into passages of a few sentences,
+scored with Okapi BM25 against the analyst's question and search query, and only the
+best passages are passed on to the answer prompt. Scoring is vectorized with NumPy over
+the query terms and needs no model download; an interview's few dozen documents rank in
+a few milliseconds on a CPU.
+"""
+
+import logging
+import re
+import time
+from typing import Iterable, List
+
+import numpy as np
+
+from app.utils.context import ContextDocument, pack_documents, parse_documents
+
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how i if in into is it its
+may more most not of on or our so such than that the their them then there these they this to was
+we were what when where which while who why will with would you your
+""".split())
+
+# Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_documents(documents: Iterable[ContextDocument], passage_words: int = 150) -> List[ContextDocument]:
+    """
+    Split each document into passages of about passage_words words, on sentence boundaries.
+
+    Passages keep their document's attributes (source URL etc.) so they can be cited.
+    """
+    passages = []
+    for document in documents:
+        current, length = [], 0
+        for sentence in _SENTENCE.split(document.body):
+            words = len(sentence.split())
+            if current and length + words > passage_words:
+                passages.append(document._replace(body=" ".join(current)))
+                current, length = [], 0
+            current.append(sentence)
+            length += words
+        if current:
+            passages.append(document._replace(body=" ".join(current)))
+    return passages
+
+
+def bm25_scores(query: str, passages: List[str]) -> np.ndarray:
+    """Okapi BM25 score of every passage for the query"""
+    terms = {term: i for i, term in enumerate(dict.fromkeys(tokenize(query)))}
+    if not terms or not passages:
+        return np.zeros(len(passages))
+
+    # Term frequency of only the query terms, as a passages x terms matrix. Matching the
+    # terms with one regex keeps the per-token work in C rather than a Python loop.
+    matcher = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b")
+    passage_ids, term_ids = [], []
+    for p, passage in enumerate(passages):
+        for token in matcher.findall(passage.lower()):
+            passage_ids.append(p)
+            term_ids.append(terms[token])
+    tf = np.zeros((len(passages), len(terms)))
+    np.add.at(tf, (np.array(passage_ids, dtype=np.intp), np.array(term_ids, dtype=np.intp)), 1)
+    lengths = np.fromiter((len(passage.split()) for passage in passages), dtype=float, count=len(passages))
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((len(passages) - df + 0.5) / (df + 0.5) + 1)
+    norm = K1 * (1 - B + B * lengths / max(lengths.mean(), 1.0))
+    return (idf * tf * (K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def rank_passages(query: str, context: Iterable, top_k: int = 8, passage_words: int = 150) -> List[ContextDocument]:
+    """
+    Return the top_k passages of the context for the query, best first.
+
+    Args:
+        query: Text to rank against, e.g. the analyst question and search query
+        context: InterviewState.context, a list of formatted search results
+        top_k: Number of passages to keep
+        passage_words: Approximate passage length in words
+    """
+    started = time.perf_counter()
+    passages = chunk_documents(parse_documents(context), passage_words)
+    if len(passages) <= top_k:
+        return passages
+    scores = bm25_scores(query, [passage.body for passage in passages])
+    best = np.argpartition(-scores, top_k)[:top_k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    logger.info(f"Ranked {len(passages)} passages in {(time.perf_counter() - started) * 1000:.1f} ms, kept {top_k}")
+    return [passages[i] for i in best]
+
+
+def retrieve_context(query: str, context: Iterable, top_k: int, budget_tokens: int, passage_words: int = 150) -> str:
+    """Render the best passages for the query within the token budget"""
+    return pack_documents(rank_passages(query, context, top_k, passage_words), budget_tokens)
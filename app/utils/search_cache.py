@@ -0,0 +1,84 @@
+"""
+Persistent cache for Tavily, Wikipedia and NewsAPI search results.
+"""
+
+import re
+import logging
+from typing import Optional
+from app.config import settings
+from app.utils.cache import DiskCache, MemoryCache, TieredCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+_search_cache = None
+
+# Bumped when normalize_query changes, so entries stored under the old keys are never read
+_KEY_VERSION = 2
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so queries differing only in formatting share a cache entry.
+    
+    Lowercases, strips punctuation and collapses whitespace, so "NVIDIA: founding story"
+    and "nvidia founding story" share an entry. Word order is kept, since "python to rust"
+    and "rust to python" are different searches.
+    """
+    return " ".join(re.findall(r"[\w]+", (query or "").lower()))
+
+
+class SearchCache:
+    """
+    Search result cache with a TTL per source (short for news, long for Wikipedia).
+    
+    Only successful responses are stored, so provider errors are retried on the next call.
+    """
+
+    def __init__(self, cache: TieredCache, ttls: dict):
+        self.cache = cache
+        self.ttls = ttls
+
+    @staticmethod
+    def _key(source: str, query: str, params: dict) -> str:
+        return make_cache_key(source, normalize_query(query), params, _KEY_VERSION)
+
+    def get(self, source: str, query: str, **params):
+        docs = self.cache.get(self._key(source, query, params))
+        if docs is not None:
+            logger.info(f"{source} search served from cache: {query}")
+        return docs
+
+    def set(self, source: str, query: str, docs, **params):
+        if not self._is_cacheable(docs):
+            return
+        self.cache.set(self._key(source, query, params), docs, ttl_seconds=self.ttls.get(source))
+
+    @staticmethod
+    def _is_cacheable(docs) -> bool:
+        # Tavily reports failures as a string and NewsAPI as a non-"ok" status
+        if isinstance(docs, dict):
+            return docs.get("status") == "ok"
+        return isinstance(docs, list)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Returns the shared search cache, or None when SEARCH_CACHE_ENABLED is off"""
+    global _search_cache
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            TieredCache(
+                MemoryCache(max_entries=settings.SEARCH_CACHE_MAX_ENTRIES),
+                DiskCache(settings.SEARCH_CACHE_PATH, max_bytes=settings.SEARCH_CACHE_MAX_BYTES)
+            ),
+            ttls={
+                "web": settings.SEARCH_CACHE_TTL_WEB,
+                "wikipedia": settings.SEARCH_CACHE_TTL_WIKIPEDIA,
+                "news": settings.SEARCH_CACHE_TTL_NEWS,
+            }
+        )
+    return _search_cache
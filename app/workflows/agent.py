@@ -1,40 +1,92 @@
 # agent.py
-from langgraph.graph import START, StateGraph
-from langgraph.prebuilt import tools_condition, ToolNode
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, Optional
+from uuid import uuid4
+from langgraph.graph import START, END, StateGraph
 from langgraph.graph import MessagesState
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
+from app.services.clients import get_http_client, get_async_http_client
+from app.tools.tool_registry import function_to_schema
 
 
+logger = logging.getLogger(__name__)
+
 
 class Agent:
-    def __init__(self, tools): #), assistant):
+    def __init__(self, tools, parallel: bool = False, auto_approve: Iterable[str] = (),
+                 tool_timeout: float = 30.0, tool_timeouts: Optional[Dict[str, float]] = None,
+                 max_workers: int = 8): #), assistant):
         """
         Initialize the agent with the given tools and assistant.
         This sets up the langgraph state graph.
+        
+        The tool-bound model and the compiled graph are built once here and reused
+        for every turn; the async graph is compiled on the first aprocess_message call.
+        
+        Args:
+            tools: Tool functions the model may call
+            parallel: Let the model request several tool calls in one message; they run
+                concurrently, so a turn takes as long as its slowest call
+            auto_approve: Names of read-only tools that run without the human approval
+                interrupt (only when every call in the message is whitelisted)
+            tool_timeout: Seconds a tool call may take before an error is returned to the model
+            tool_timeouts: Per-tool overrides of tool_timeout
+            max_workers: Size of the thread pool that runs the tool calls
         """
-        self.builder = StateGraph(MessagesState)
         self.sys_msg = SystemMessage(content="You are a helpful assistant tasked with fetching news.")
         self.memory = MemorySaver()
         
         self.tools = tools
+        self.tools_by_name = {tool.__name__: tool for tool in tools}
+        self.auto_approve = frozenset(auto_approve)
+        self.tool_timeout = tool_timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-tool")
         # self.assistant = assistant
-        self._initialize_graph()
+        llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0.5,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client()
+        )
+        self.llm_with_tools = llm.bind_tools(
+            [function_to_schema(tool) for tool in self.tools],
+            parallel_tool_calls=parallel
+        )
+        self.react_graph = self._initialize_graph(use_async=False)
+        self._async_react_graph = None
 
-    def _initialize_graph(self):
+    def _initialize_graph(self, use_async: bool = False):
         """Initialize graph structure in langgraph"""
+        builder = StateGraph(MessagesState)
         # Define nodes: assistant node and tool node.
-        self.builder.add_node("assistant", self.assistant)
-        self.builder.add_node("tools", ToolNode(self.tools))
+        builder.add_node("assistant", self.aassistant if use_async else self.assistant)
+        # "tools" waits for approval, "auto_tools" runs whitelisted read-only tools right away
+        tool_node = self.arun_tools if use_async else self.run_tools
+        builder.add_node("tools", tool_node)
+        builder.add_node("auto_tools", tool_node)
         # Define the initial edge from START to the assistant node.
-        self.builder.add_edge(START, "assistant")
+        builder.add_edge(START, "assistant")
         # Define conditional edges from assistant based on message content.
-        self.builder.add_conditional_edges("assistant", tools_condition)
+        builder.add_conditional_edges("assistant", self.route_tools, ["tools", "auto_tools", END])
         # Connect tools back to assistant (ReAct)
-        self.builder.add_edge("tools", "assistant")
-        # Compile the state graph.
-        self.react_graph = self.builder.compile(interrupt_before=["tools"], checkpointer=self.memory)
+        builder.add_edge("tools", "assistant")
+        builder.add_edge("auto_tools", "assistant")
+        # Compile the state graph. Both graphs share the checkpointer, so a thread can be
+        # continued from either.
+        return builder.compile(interrupt_before=["tools"], checkpointer=self.memory)
+
+    @property
+    def async_react_graph(self):
+        if self._async_react_graph is None:
+            self._async_react_graph = self._initialize_graph(use_async=True)
+        return self._async_react_graph
 
     def assistant(self, state: MessagesState) -> str:
         """
@@ -42,18 +94,94 @@ class Agent:
         In a real implementation, you would update the MessagesState,
         trigger the graph execution, and capture the response.
         """
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.5)
+        return {"messages": [self.llm_with_tools.invoke([self.sys_msg] + state["messages"])]}
+
+    async def aassistant(self, state: MessagesState) -> str:
+        """ Async version of assistant """
+        return {"messages": [await self.llm_with_tools.ainvoke([self.sys_msg] + state["messages"])]}
+
+    def route_tools(self, state: MessagesState) -> str:
+        """Route tool calls to the approval step unless every requested tool is whitelisted"""
+        tool_calls = getattr(state["messages"][-1], "tool_calls", None)
+        if not tool_calls:
+            return END
+        if all(call["name"] in self.auto_approve for call in tool_calls):
+            return "auto_tools"
+        return "tools"
+
+    def _timeout_for(self, name: str) -> float:
+        return self.tool_timeouts.get(name, self.tool_timeout)
+
+    def _call_tool(self, call: dict) -> str:
+        """Run one tool call, returning errors as text so the model can react to them"""
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return f"Error: {call['name']} is not a valid tool, try one of {list(self.tools_by_name)}."
+        try:
+            result = tool(**call["args"])
+        except Exception as e:
+            logger.error(f"Tool {call['name']} failed: {str(e)}", exc_info=True)
+            return f"Error: {repr(e)}\n Please fix your mistakes."
+        return result if isinstance(result, str) else json.dumps(result, default=str)
 
-        llm_with_tools = llm.bind_tools(self.tools, parallel_tool_calls=False)
-        return {"messages": [llm_with_tools.invoke([self.sys_msg] + state["messages"])]}
+    def _timeout_message(self, call: dict) -> str:
+        logger.warning(f"Tool {call['name']} timed out after {self._timeout_for(call['name'])}s")
+        return f"Error: {call['name']} timed out after {self._timeout_for(call['name'])} seconds."
 
+    def run_tools(self, state: MessagesState):
+        """ Node to run every tool call of the last message concurrently in the thread pool """
+        tool_calls = state["messages"][-1].tool_calls
+        started = time.monotonic()
+        futures = [(call, self._executor.submit(self._call_tool, call)) for call in tool_calls]
+        messages = []
+        for call, future in futures:
+            remaining = max(0.0, started + self._timeout_for(call["name"]) - time.monotonic())
+            try:
+                content = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # The call can't be interrupted, but the turn no longer waits for it
+                future.cancel()
+                content = self._timeout_message(call)
+            messages.append(ToolMessage(content=content, name=call["name"], tool_call_id=call["id"]))
+        return {"messages": messages}
 
-    def process_message(self, user_input: str) -> str:
-        """Processes the user input"""
+    async def _acall_tool(self, call: dict) -> str:
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self._call_tool, call),
+                timeout=self._timeout_for(call["name"])
+            )
+        except asyncio.TimeoutError:
+            return self._timeout_message(call)
+
+    async def arun_tools(self, state: MessagesState):
+        """ Async node to run every tool call of the last message concurrently """
+        tool_calls = state["messages"][-1].tool_calls
+        contents = await asyncio.gather(*[self._acall_tool(call) for call in tool_calls])
+        return {"messages": [
+            ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+            for call, content in zip(tool_calls, contents)
+        ]}
+
+    @staticmethod
+    def _thread(thread_id: str = None) -> dict:
+        return {"configurable": {"thread_id": thread_id or str(uuid4())}}
+
+    def process_message(self, user_input: str, thread_id: str = None) -> str:
+        """Processes the user input, continuing the conversation of thread_id when given"""
         messages = [HumanMessage(content=user_input)]
 
-        messages = self.react_graph.invoke({"messages": messages})
+        messages = self.react_graph.invoke({"messages": messages}, self._thread(thread_id))
 
         for m in messages["messages"]:
             m.pretty_print()
         return messages['messages'][-1].content
+
+    async def aprocess_message(self, user_input: str, thread_id: str = None) -> str:
+        """Async version of process_message"""
+        messages = [HumanMessage(content=user_input)]
+
+        messages = await self.async_react_graph.ainvoke({"messages": messages}, self._thread(thread_id))
+
+        return messages['messages'][-1].content
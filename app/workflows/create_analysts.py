@@ -4,7 +4,7 @@ from langchain_core.messages import SystemMessage, HumanMessage
 from app.models.models import Perspectives, GenerateAnalystsState
 from app.config import settings
 from app.prompts.prompts import analyst_instructions
-from app.utils.llm_utils import invoke_llm
+from app.utils.llm_utils import invoke_llm, ainvoke_llm
 
 class CreateAnalysts:
     """
@@ -25,39 +25,52 @@ class CreateAnalysts:
     
     Methods:
         create_analysts: Generates a list of Analyst objects with diverse expertise
+        acreate_analysts: Async version of create_analysts
     """
     def __init__(self):
         self.llm = settings.llm
         self.analyst_instructions = analyst_instructions
 
 
-    def create_analysts(self, state: GenerateAnalystsState):
-        """ Create analysts """
-        
+    def _analyst_messages(self, state: GenerateAnalystsState):
+        """ Build the prompt for generating analysts """
         topic=state['topic']
         max_analysts=state['max_analysts']
         human_analyst_feedback=state.get('human_analyst_feedback', '')
         num_themes = max_analysts - 1
-            
-        # Enforce structured output
-        structured_llm = self.llm.with_structured_output(Perspectives)
 
         # System message
-        system_message = analyst_instructions.format(topic=topic,
+        system_message = self.analyst_instructions.format(topic=topic,
                                                     human_analyst_feedback=human_analyst_feedback, 
                                                     num_themes=num_themes,
                                                     max_analysts=max_analysts)
+        return [SystemMessage(content=system_message)]+[HumanMessage(content="Generate the set of analysts.")]
+
+    def create_analysts(self, state: GenerateAnalystsState):
+        """ Create analysts """
+        # Enforce structured output
+        structured_llm = self.llm.with_structured_output(Perspectives)
 
         # Generate question         
         analysts = invoke_llm(
             structured_llm, 
-            [SystemMessage(content=system_message)]+[HumanMessage(content="Generate the set of analysts.")],
+            self._analyst_messages(state),
             function_name="create_analysts"
         )
 
         # Write the list of analysis to state
         return {"analysts": analysts.analysts}
 
+    async def acreate_analysts(self, state: GenerateAnalystsState):
+        """ Async node to create analysts """
+        structured_llm = self.llm.with_structured_output(Perspectives)
+        analysts = await ainvoke_llm(
+            structured_llm, 
+            self._analyst_messages(state),
+            function_name="create_analysts"
+        )
+        return {"analysts": analysts.analysts}
+
     @staticmethod
     def human_feedback(state: GenerateAnalystsState):
         pass
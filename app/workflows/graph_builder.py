@@ -6,28 +6,39 @@ from app.workflows.create_analysts import CreateAnalysts
 from app.workflows.interview import InterviewBuilder
 from app.workflows.research import ConductResearch
 from langgraph.checkpoint.memory import MemorySaver
+from app.utils.metrics import timed_node
+from app.config import settings
 
 
-def build_interview_graph():
+def build_interview_graph(use_async: bool = False):
+    """
+    Build the interview subgraph.
+    
+    With use_async=True the async node implementations are registered, so the
+    graph must be driven with ainvoke/astream.
+    """
     interview_builder = StateGraph(InterviewState)
     
     # Create an instance of InterviewBuilder
     builder = InterviewBuilder()
     
-    # Use instance methods
-    interview_builder.add_node("ask_question", builder.generate_question)
-    interview_builder.add_node("search_web", builder.search_web)
-    interview_builder.add_node("search_wikipedia", builder.search_wikipedia)
-    interview_builder.add_node("search_news", builder.search_news) #
-    interview_builder.add_node("answer_question", builder.generate_answer)
-    interview_builder.add_node("save_interview", builder.save_interview)
-    interview_builder.add_node("write_section", builder.write_section)
+    # Use instance methods, picking the async implementation when use_async is set
+    impl = lambda sync, async_: async_ if use_async else sync
+    interview_builder.add_node("ask_question", timed_node("ask_question", impl(builder.generate_question, builder.agenerate_question)))
+    interview_builder.add_node("generate_search_query", timed_node("generate_search_query", impl(builder.generate_search_query, builder.agenerate_search_query)))
+    interview_builder.add_node("search_web", timed_node("search_web", impl(builder.search_web, builder.asearch_web)))
+    interview_builder.add_node("search_wikipedia", timed_node("search_wikipedia", impl(builder.search_wikipedia, builder.asearch_wikipedia)))
+    interview_builder.add_node("search_news", timed_node("search_news", impl(builder.search_news, builder.asearch_news))) #
+    interview_builder.add_node("answer_question", timed_node("answer_question", impl(builder.generate_answer, builder.agenerate_answer)))
+    interview_builder.add_node("save_interview", timed_node("save_interview", builder.save_interview))
+    interview_builder.add_node("write_section", timed_node("write_section", impl(builder.write_section, builder.awrite_section)))
 
     # Flow
     interview_builder.add_edge(START, "ask_question")
-    interview_builder.add_edge("ask_question", "search_web")
-    interview_builder.add_edge("ask_question", "search_wikipedia")
-    interview_builder.add_edge("ask_question", "search_news") #
+    interview_builder.add_edge("ask_question", "generate_search_query")
+    interview_builder.add_edge("generate_search_query", "search_web")
+    interview_builder.add_edge("generate_search_query", "search_wikipedia")
+    interview_builder.add_edge("generate_search_query", "search_news") #
     interview_builder.add_edge("search_web", "answer_question")
     interview_builder.add_edge("search_wikipedia", "answer_question")
     interview_builder.add_edge("search_news", "answer_question") #
@@ -38,32 +49,56 @@ def build_interview_graph():
     return interview_builder
 
 
-def build_research_graph():
+def build_research_graph(use_async: bool = False, checkpointer=None):
+    """
+    Build and compile the research graph.
+    
+    With use_async=True every LLM and search node is a coroutine, so a single
+    event loop can drive many research runs concurrently via ainvoke/astream.
+    The checkpointer defaults to an in-process MemorySaver; pass a persistent
+    one (see app.services.checkpoints) to share threads across workers.
+    When REPORT_SYNTHESIS_MODE resolves to combined, the write_report node also writes the
+    introduction and conclusion, replacing the write_introduction/write_conclusion nodes.
+    """
     builder = StateGraph(ResearchGraphState)
-    interview_builder = build_interview_graph()
+    interview_builder = build_interview_graph(use_async=use_async)
     create_analysts = CreateAnalysts()
     conduct_research = ConductResearch()
+    combined_report = settings.combined_report_synthesis
     
-    # Adding nodes
-    builder.add_node("create_analysts", create_analysts.create_analysts) # current state: topic, max_analysts, analysts
-    builder.add_node("human_feedback", create_analysts.human_feedback)
+    # Adding nodes, picking the async implementation when use_async is set
+    impl = lambda sync, async_: async_ if use_async else sync
+    builder.add_node("create_analysts", timed_node("create_analysts", impl(create_analysts.create_analysts, create_analysts.acreate_analysts))) # current state: topic, max_analysts, analysts
+    builder.add_node("human_feedback", timed_node("human_feedback", create_analysts.human_feedback))
     builder.add_node("conduct_interview", interview_builder.compile())
-    builder.add_node("write_report", conduct_research.write_report)
-    builder.add_node("write_introduction", conduct_research.write_introduction)
-    builder.add_node("write_conclusion", conduct_research.write_conclusion)
-    builder.add_node("finalize_report", conduct_research.finalize_report)
+    if combined_report:
+        builder.add_node("write_report", timed_node("write_report", impl(conduct_research.synthesize_report, conduct_research.asynthesize_report)))
+    else:
+        builder.add_node("write_report", timed_node("write_report", impl(conduct_research.write_report, conduct_research.awrite_report)))
+        builder.add_node("write_introduction", timed_node("write_introduction", impl(conduct_research.write_introduction, conduct_research.awrite_introduction)))
+        builder.add_node("write_conclusion", timed_node("write_conclusion", impl(conduct_research.write_conclusion, conduct_research.awrite_conclusion)))
+    builder.add_node("write_podcast", timed_node("write_podcast", impl(conduct_research.write_podcast, conduct_research.awrite_podcast)))
+    builder.add_node("finalize_report", timed_node("finalize_report", conduct_research.finalize_report))
     
     # Defining workflow logic with edges
     builder.add_edge(START, "create_analysts")
     builder.add_edge("create_analysts", "human_feedback")
     builder.add_conditional_edges("human_feedback", conduct_research.initiate_all_interviews, ["create_analysts", "conduct_interview"])
     builder.add_edge("conduct_interview", "write_report")
-    builder.add_edge("conduct_interview", "write_introduction")
-    builder.add_edge("conduct_interview", "write_conclusion")
-    builder.add_edge(["write_conclusion", "write_report", "write_introduction"], "finalize_report")
+    # The podcast only needs the report body, so it overlaps the rest of the report phase
+    builder.add_edge("write_report", "write_podcast")
+    if combined_report:
+        # write_report already produced the introduction and conclusion
+        builder.add_edge("write_report", "finalize_report")
+    else:
+        builder.add_edge("conduct_interview", "write_introduction")
+        builder.add_edge("conduct_interview", "write_conclusion")
+        builder.add_edge(["write_conclusion", "write_report", "write_introduction"], "finalize_report")
+    builder.add_edge("write_podcast", END)
     builder.add_edge("finalize_report", END)
     
-    memory = MemorySaver()
-    graph = builder.compile(interrupt_before=['human_feedback'], checkpointer=memory)
+    if checkpointer is None:
+        checkpointer = MemorySaver()
+    graph = builder.compile(interrupt_before=['human_feedback'], checkpointer=checkpointer)
     
     return graph
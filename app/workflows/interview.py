@@ -1,12 +1,16 @@
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, get_buffer_string
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_community.document_loaders import WikipediaLoader
 from app.models.models import InterviewState, SearchQuery
 from app.prompts.prompts import question_instructions, search_instructions, answer_instructions, section_writer_instructions
 from app.config import settings
-from app.utils.llm_utils import invoke_llm
-from newsapi import NewsApiClient
+from app.utils.llm_utils import invoke_llm, ainvoke_llm
+from app.utils.search_cache import get_search_cache
+from app.services.clients import get_tavily_search, get_news_api
+from app.utils.metrics import timed, record_cache
+from app.utils.context import compact_context
+from app.utils.retrieval import retrieve_context
 import datetime
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,9 +24,10 @@ class InterviewBuilder:
     
     The interview process follows these steps:
     1. Generate a question based on the analyst's persona
-    2. Search for relevant information from web, Wikipedia, and news sources
-    3. Generate an answer based on the gathered information
-    4. Write a section summarizing the analyst's insights
+    2. Turn the conversation into a single search query
+    3. Search for relevant information from web, Wikipedia, and news sources
+    4. Generate an answer based on the gathered information
+    5. Write a section summarizing the analyst's insights
     
     Attributes:
         llm: The language model used for generating questions, answers, and sections
@@ -31,11 +36,12 @@ class InterviewBuilder:
         answer_instructions: Instructions for generating answers
         section_writer_instructions: Instructions for writing sections
         todays_date: The current date in YYYY-MM-DD format
-        tavily_search: Client for searching the web using Tavily
-        news_api: Client for searching news using NewsAPI
+        tavily_search: Shared client for searching the web using Tavily
+        news_api: Shared client for searching news using NewsAPI
     
     Methods:
         generate_question: Generates a question based on the analyst's persona
+        generate_search_query: Generates the search query used by all search nodes this turn
         search_web: Searches the web for information using Tavily
         search_wikipedia: Searches Wikipedia for information
         search_news: Searches news articles using NewsAPI
@@ -43,6 +49,9 @@ class InterviewBuilder:
         save_interview: Saves the interview transcript
         route_messages: Routes between question and answer based on the interview state
         write_section: Writes a section summarizing the analyst's insights
+    
+    Every node also has an async counterpart prefixed with ``a`` (e.g. ``agenerate_question``)
+    used when the graph is built for async execution.
     """
     def __init__(self):
         # Initialize LLM
@@ -55,21 +64,188 @@ class InterviewBuilder:
         self.section_writer_instructions = section_writer_instructions
         self.todays_date = datetime.date.today().strftime("%Y-%m-%d")
         
-        # Initialize search clients
-        self.tavily_search = TavilySearchResults(
-            api_key=settings.TAVILY_API_KEY,
-            max_results=5
+    @property
+    def tavily_search(self):
+        """ Shared Tavily client, created on first search """
+        return get_tavily_search()
+
+    @property
+    def news_api(self):
+        """ Shared NewsAPI client, created on first search """
+        return get_news_api()
+
+    def _question_messages(self, state: InterviewState):
+        """ Build the prompt for generating a question """
+        analyst = state["analyst"]
+        system_message = self.question_instructions.format(goals=analyst.persona)
+        return [SystemMessage(content=system_message)] + state["messages"]
+
+    def _search_query_messages(self, state: InterviewState):
+        """ Build the prompt for generating a search query """
+        system_message = self.search_instructions.format(todays_date=self.todays_date)
+        return [SystemMessage(content=system_message)] + state['messages']
+
+    def _answer_messages(self, state: InterviewState):
+        """ Build the prompt for answering a question """
+        analyst = state["analyst"]
+        if settings.RETRIEVAL_TOP_K > 0:
+            # Rank against the latest question and the query the search nodes used for it
+            query = f"{state['messages'][-1].content} {state.get('search_query') or ''}"
+            context = retrieve_context(query, state["context"], settings.RETRIEVAL_TOP_K,
+                                       settings.CONTEXT_TOKEN_BUDGET, settings.RETRIEVAL_PASSAGE_WORDS)
+        else:
+            context = compact_context(state["context"], settings.CONTEXT_TOKEN_BUDGET)
+        system_message = self.answer_instructions.format(goals=analyst.persona, context=context)
+        return [SystemMessage(content=system_message)] + state["messages"]
+
+    def _section_messages(self, state: InterviewState):
+        """ Build the prompt for writing a section """
+        context = compact_context(state["context"], settings.CONTEXT_TOKEN_BUDGET)
+        analyst = state["analyst"]
+        system_message = self.section_writer_instructions.format(focus=analyst.description)
+        return [SystemMessage(content=system_message)] + [HumanMessage(content=f"Use this source to write your section: {context}")]
+
+    @staticmethod
+    def _cached_search(source: str, query: str, fetch, **params):
+        """ Return cached results for the query, calling fetch() on a miss """
+        cache = get_search_cache()
+        if cache is None:
+            with timed("search", source):
+                return fetch()
+        search_docs = cache.get(source, query, **params)
+        record_cache(f"search_{source}", search_docs is not None)
+        if search_docs is None:
+            with timed("search", source):
+                search_docs = fetch()
+            cache.set(source, query, search_docs, **params)
+        return search_docs
+
+    @staticmethod
+    async def _acached_search(source: str, query: str, fetch, **params):
+        """ Async version of _cached_search where fetch() returns an awaitable """
+        cache = get_search_cache()
+        if cache is None:
+            with timed("search", source):
+                return await fetch()
+        # The cache is SQLite-backed, so keep its reads and writes off the event loop
+        search_docs = await asyncio.to_thread(cache.get, source, query, **params)
+        record_cache(f"search_{source}", search_docs is not None)
+        if search_docs is None:
+            with timed("search", source):
+                search_docs = await fetch()
+            await asyncio.to_thread(cache.set, source, query, search_docs, **params)
+        return search_docs
+
+    @staticmethod
+    def _news_search_params(search_query: str):
+        """ Build the NewsAPI request parameters for a search query """
+        logger.info(f"Making NewsAPI request with query: {search_query}")
+        
+        # Add more parameters to help with debugging
+        search_params = {
+            'q': search_query,
+            'language': 'en',
+            'sort_by': 'relevancy',
+            'page': 1,
+            'page_size': 10
+        }
+        logger.info(f"NewsAPI request parameters: {search_params}")
+        return search_params
+
+    @staticmethod
+    def _format_web_docs(search_docs):
+        """ Format Tavily results into context documents """
+        # Handle both string and dictionary formats
+        formatted_docs = []
+        for doc in search_docs:
+            if isinstance(doc, dict):
+                # Handle dictionary format
+                url = doc.get('url', '')
+                content = doc.get('content', '')
+                formatted_docs.append(f'<Document href="{url}"/>\n{content}\n</Document>')
+            else:
+                # Handle string format
+                formatted_docs.append(f'<Document>\n{doc}\n</Document>')
+            
+        formatted_search_docs = "\n\n---\n\n".join(formatted_docs)
+        return {"context": [formatted_search_docs]}
+
+    @staticmethod
+    def _format_wikipedia_docs(search_docs):
+        """ Format Wikipedia documents into context documents """
+        formatted_search_docs = "\n\n---\n\n".join(
+            [
+                f'<Document source="{doc.metadata["source"]}" page="{doc.metadata.get("page", "")}"/>\n{doc.page_content}\n</Document>'
+                for doc in search_docs
+            ]
         )
-        self.news_api = NewsApiClient(api_key=settings.NEWS_API_KEY)
+        return {"context": [formatted_search_docs]}
+
+    @staticmethod
+    def _format_news_docs(search_docs):
+        """ Format a NewsAPI response into context documents """
+        if not search_docs:
+            logger.warning("Empty response from NewsAPI")
+            return {"context": ["No recent news articles found."]}
+            
+        if 'articles' not in search_docs:
+            logger.warning(f"Unexpected NewsAPI response structure: {search_docs}")
+            return {"context": ["Error in news API response format."]}
+        
+        if not search_docs['articles']:
+            logger.warning("No articles found in NewsAPI response")
+            return {"context": ["No recent news articles found."]}
+        
+        formatted_search_docs = [f'<Document source="{doc["url"]}" published={doc["publishedAt"]}/>\n{doc["content"]}\n</Document>' for doc in search_docs["articles"]]
+        return {"context": [formatted_search_docs]}
+
+    @staticmethod
+    def _log_news_error(e: Exception):
+        """ Log a NewsAPI failure including the HTTP response when available """
+        logger.error(f"Error in search_news: {str(e)}", exc_info=True)
+        logger.error(f"Error type: {type(e)}")
+        if hasattr(e, 'response'):
+            logger.error(f"Response status code: {e.response.status_code}")
+            logger.error(f"Response content: {e.response.text}")
 
     def generate_question(self, state: InterviewState):
         """ Node to generate a question """
-        analyst = state["analyst"]
-        messages = state["messages"]
-        system_message = self.question_instructions.format(goals=analyst.persona)
-        question = invoke_llm(self.llm, [SystemMessage(content=system_message)] + messages, function_name="generate_question")
+        question = invoke_llm(self.llm, self._question_messages(state), function_name="generate_question")
         return {"messages": [question]}
 
+    async def agenerate_question(self, state: InterviewState):
+        """ Async node to generate a question """
+        question = await ainvoke_llm(self.llm, self._question_messages(state), function_name="generate_question")
+        return {"messages": [question]}
+
+    def generate_search_query(self, state: InterviewState):
+        """ Node to generate the search query shared by the search nodes """
+        structured_llm = self.llm.with_structured_output(SearchQuery)
+        search_query = invoke_llm(
+            structured_llm, 
+            self._search_query_messages(state),
+            function_name="generate_search_query"
+        )
+        return self._search_query_update(state, search_query)
+
+    async def agenerate_search_query(self, state: InterviewState):
+        """ Async node to generate the search query shared by the search nodes """
+        structured_llm = self.llm.with_structured_output(SearchQuery)
+        search_query = await ainvoke_llm(
+            structured_llm, 
+            self._search_query_messages(state),
+            function_name="generate_search_query"
+        )
+        return self._search_query_update(state, search_query)
+
+    @staticmethod
+    def _search_query_update(state: InterviewState, search_query):
+        """ Extract the query, falling back to the last question if the LLM call failed """
+        if isinstance(search_query, SearchQuery) and search_query.search_query:
+            return {"search_query": search_query.search_query}
+        logger.warning("No search query generated, searching with the analyst question instead")
+        return {"search_query": state["messages"][-1].content}
+
     def search_web(self, state: InterviewState):
         """ Retrieve docs from web search """
         try:
@@ -78,29 +254,26 @@ class InterviewBuilder:
             if not settings.TAVILY_API_KEY:
                 raise ValueError("TAVILY_API_KEY is not set")
 
-            system_message = self.search_instructions.format(todays_date=self.todays_date)
-            structured_llm = self.llm.with_structured_output(SearchQuery)
-            search_query = invoke_llm(
-                structured_llm, 
-                [SystemMessage(content=system_message)] + state['messages'],
-                function_name="search_web"
+            query = state["search_query"]
+            search_docs = self._cached_search(
+                "web", query, lambda: self.tavily_search.invoke(query), max_results=self.tavily_search.max_results
             )
-            search_docs = self.tavily_search.invoke(search_query.search_query)
-            
-            # Handle both string and dictionary formats
-            formatted_docs = []
-            for doc in search_docs:
-                if isinstance(doc, dict):
-                    # Handle dictionary format
-                    url = doc.get('url', '')
-                    content = doc.get('content', '')
-                    formatted_docs.append(f'<Document href="{url}"/>\n{content}\n</Document>')
-                else:
-                    # Handle string format
-                    formatted_docs.append(f'<Document>\n{doc}\n</Document>')
-                
-                formatted_search_docs = "\n\n---\n\n".join(formatted_docs)
-                return {"context": [formatted_search_docs]}
+            return self._format_web_docs(search_docs)
+        except Exception as e:
+            logger.error(f"Error in search_web: {str(e)}", exc_info=True)
+            return {"context": ["Error retrieving web search results. Please try again later."]}
+
+    async def asearch_web(self, state: InterviewState):
+        """ Async retrieve docs from web search """
+        try:
+            if not settings.TAVILY_API_KEY:
+                raise ValueError("TAVILY_API_KEY is not set")
+
+            query = state["search_query"]
+            search_docs = await self._acached_search(
+                "web", query, lambda: self.tavily_search.ainvoke(query), max_results=self.tavily_search.max_results
+            )
+            return self._format_web_docs(search_docs)
         except Exception as e:
             logger.error(f"Error in search_web: {str(e)}", exc_info=True)
             return {"context": ["Error retrieving web search results. Please try again later."]}
@@ -108,25 +281,26 @@ class InterviewBuilder:
     def search_wikipedia(self, state: InterviewState):
         """ Retrieve docs from wikipedia """
         try:
-            structured_llm = self.llm.with_structured_output(SearchQuery)
-            system_message = self.search_instructions.format(todays_date=self.todays_date)
-            search_query = invoke_llm(
-                structured_llm, 
-                [SystemMessage(content=system_message)] + state['messages'],
-                function_name="search_wikipedia"
-            )
-            
             # Create the loader here with the query
-            wiki_loader = WikipediaLoader(query=search_query.search_query, load_max_docs=2)
-            search_docs = wiki_loader.load()
-            
-            formatted_search_docs = "\n\n---\n\n".join(
-                [
-                    f'<Document source="{doc.metadata["source"]}" page="{doc.metadata.get("page", "")}"/>\n{doc.page_content}\n</Document>'
-                    for doc in search_docs
-                ]
+            wiki_loader = WikipediaLoader(query=state["search_query"], load_max_docs=2)
+            search_docs = self._cached_search(
+                "wikipedia", wiki_loader.query, wiki_loader.load, load_max_docs=wiki_loader.load_max_docs
             )
-            return {"context": [formatted_search_docs]}
+            return self._format_wikipedia_docs(search_docs)
+        except Exception as e:
+            logger.error(f"Error in search_wikipedia: {str(e)}", exc_info=True)
+            return {"context": ["Error retrieving wikipedia search results. Please try again later."]}
+
+    async def asearch_wikipedia(self, state: InterviewState):
+        """ Async retrieve docs from wikipedia """
+        try:
+            # The Wikipedia client is blocking, so load in a worker thread
+            wiki_loader = WikipediaLoader(query=state["search_query"], load_max_docs=2)
+            search_docs = await self._acached_search(
+                "wikipedia", wiki_loader.query, lambda: asyncio.to_thread(wiki_loader.load),
+                load_max_docs=wiki_loader.load_max_docs
+            )
+            return self._format_wikipedia_docs(search_docs)
         except Exception as e:
             logger.error(f"Error in search_wikipedia: {str(e)}", exc_info=True)
             return {"context": ["Error retrieving wikipedia search results. Please try again later."]}
@@ -139,58 +313,44 @@ class InterviewBuilder:
             if not settings.NEWS_API_KEY:
                 raise ValueError("NEWS_API_KEY is not set")
 
-            structured_llm = self.llm.with_structured_output(SearchQuery)
-            system_message = self.search_instructions.format(todays_date=self.todays_date)
-            search_query = invoke_llm(
-                structured_llm, 
-                [SystemMessage(content=system_message)] + state['messages'],
-                function_name="search_news"
+            search_params = self._news_search_params(state["search_query"])
+            search_docs = self._cached_search(
+                "news", search_params['q'], lambda: self.news_api.get_everything(**search_params),
+                page_size=search_params['page_size']
             )
+            return self._format_news_docs(search_docs)
             
-            logger.info(f"Making NewsAPI request with query: {search_query.search_query}")
-            
-            # Add more parameters to help with debugging
-            search_params = {
-                'q': search_query.search_query,
-                'language': 'en',
-                'sort_by': 'relevancy',
-                'page': 1,
-                'page_size': 10
-            }
-            logger.info(f"NewsAPI request parameters: {search_params}")
-            
-            search_docs = self.news_api.get_everything(**search_params)
-            
-            if not search_docs:
-                logger.warning("Empty response from NewsAPI")
-                return {"context": ["No recent news articles found."]}
-                
-            if 'articles' not in search_docs:
-                logger.warning(f"Unexpected NewsAPI response structure: {search_docs}")
-                return {"context": ["Error in news API response format."]}
-            
-            if not search_docs['articles']:
-                logger.warning("No articles found in NewsAPI response")
-                return {"context": ["No recent news articles found."]}
-            
-            formatted_search_docs = [f'<Document source="{doc["url"]}" published={doc["publishedAt"]}/>\n{doc["content"]}\n</Document>' for doc in search_docs["articles"]]
-            return {"context": [formatted_search_docs]}
+        except Exception as e:
+            self._log_news_error(e)
+            return {"context": ["Error retrieving news articles. Please try again later."]}
+
+    async def asearch_news(self, state: InterviewState):
+        """ Async retrieve docs from NewsAPI"""
+        try:
+            if not settings.NEWS_API_KEY:
+                raise ValueError("NEWS_API_KEY is not set")
+
+            # NewsApiClient is blocking, so run the request in a worker thread
+            search_params = self._news_search_params(state["search_query"])
+            search_docs = await self._acached_search(
+                "news", search_params['q'], lambda: asyncio.to_thread(self.news_api.get_everything, **search_params),
+                page_size=search_params['page_size']
+            )
+            return self._format_news_docs(search_docs)
             
         except Exception as e:
-            logger.error(f"Error in search_news: {str(e)}", exc_info=True)
-            logger.error(f"Error type: {type(e)}")
-            if hasattr(e, 'response'):
-                logger.error(f"Response status code: {e.response.status_code}")
-                logger.error(f"Response content: {e.response.text}")
+            self._log_news_error(e)
             return {"context": ["Error retrieving news articles. Please try again later."]}
 
     def generate_answer(self, state: InterviewState):
         """ Node to answer a question """
-        analyst = state["analyst"]
-        messages = state["messages"]
-        context = state["context"]
-        system_message = answer_instructions.format(goals=analyst.persona, context=context)
-        answer = invoke_llm(self.llm, [SystemMessage(content=system_message)] + messages, function_name="generate_answer")
+        answer = invoke_llm(self.llm, self._answer_messages(state), function_name="generate_answer")
+        answer.name = "expert"
+        return {"messages": [answer]}
+
+    async def agenerate_answer(self, state: InterviewState):
+        """ Async node to answer a question """
+        answer = await ainvoke_llm(self.llm, self._answer_messages(state), function_name="generate_answer")
         answer.name = "expert"
         return {"messages": [answer]}
 
@@ -216,12 +376,18 @@ class InterviewBuilder:
     
     def write_section(self, state: InterviewState):
         """ Node to answer a question """
-        context = state["context"]
-        analyst = state["analyst"]
-        system_message = section_writer_instructions.format(focus=analyst.description)
         section = invoke_llm(
             self.llm, 
-            [SystemMessage(content=system_message)] + [HumanMessage(content=f"Use this source to write your section: {context}")],
+            self._section_messages(state),
+            function_name="write_section"
+        )
+        return {"sections": [section.content]}
+
+    async def awrite_section(self, state: InterviewState):
+        """ Async node to write a section """
+        section = await ainvoke_llm(
+            self.llm, 
+            self._section_messages(state),
             function_name="write_section"
         )
         return {"sections": [section.content]}
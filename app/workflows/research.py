@@ -4,11 +4,12 @@ from app.workflows.create_analysts import *
 from app.workflows.interview import *
 from app.models.models import *
 from langgraph.constants import Send
+from langgraph.types import StreamWriter
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from app.config import settings
-from app.prompts.prompts import intro_conclusion_instructions, report_writer_instructions, podcast_prompt
-from app.utils.llm_utils import invoke_llm
+from app.prompts.prompts import intro_conclusion_instructions, report_writer_instructions, report_synthesis_instructions, podcast_prompt
+from app.utils.llm_utils import invoke_llm, ainvoke_llm, astream_llm_lines
 
 
 class ConductResearch:
@@ -23,12 +24,13 @@ class ConductResearch:
     1. Initiate interviews with all analysts for a given topic
     2. Collect and process information from web, Wikipedia, and news sources
     3. Generate a comprehensive report based on the gathered information
-    4. Create an introduction and conclusion for the report
-    5. Finalize the report and generate a podcast script
+    4. Create an introduction and conclusion for the report (when REPORT_SYNTHESIS_MODE resolves to
+       combined, steps 3 and 4 are a single structured-output call that sends the sections only once)
+    5. Generate a podcast script from the report body, in parallel with steps 4 and 6
+    6. Finalize the report
     
     Attributes:
         llm: The language model used for generating reports, introductions, conclusions, and podcast scripts
-        interview_builder: An instance of InterviewBuilder for managing analyst interviews
         podcast_prompt: The prompt template for generating podcast scripts
     
     Methods:
@@ -36,11 +38,15 @@ class ConductResearch:
         write_report: Generates a comprehensive report based on the gathered information
         write_introduction: Creates an introduction for the final report
         write_conclusion: Creates a conclusion for the final report
-        finalize_report: Combines the report with introduction and conclusion, and generates a podcast script
+        synthesize_report: Generates the report, introduction and conclusion in one call
+        write_podcast: Generates the podcast script as soon as the report body exists
+        finalize_report: Combines the report with introduction and conclusion
+    
+    The LLM-backed nodes also have async counterparts prefixed with ``a`` (e.g. ``awrite_report``)
+    used when the graph is built for async execution.
     """
     def __init__(self):
         self.llm = settings.llm
-        self.interview_builder = InterviewBuilder()
         self.podcast_prompt = podcast_prompt
     
     @staticmethod
@@ -60,82 +66,145 @@ class ConductResearch:
         return "create_analysts"
 
     
-    def write_report(self, state: ResearchGraphState):
-        """ Writes a report """
-        # Full set of sections
-        sections = state["sections"]
-        topic = state["topic"]
+    @staticmethod
+    def _format_sections(state: ResearchGraphState):
+        """ Concat all sections together """
+        return "\n\n".join([f"{section}" for section in state["sections"]])
 
-        # Concat all sections together
-        formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
-        
+    def _report_messages(self, state: ResearchGraphState):
+        """ Build the prompt for writing the report body """
         # Summarize the sections into a final report
-        system_message = report_writer_instructions.format(topic=topic, context=formatted_str_sections)    
+        system_message = report_writer_instructions.format(topic=state["topic"], context=self._format_sections(state))    
+        return [SystemMessage(content=system_message)] + [HumanMessage(content=f"Write a report based upon these memos.")]
+
+    def _intro_conclusion_messages(self, state: ResearchGraphState, request: str):
+        """ Build the prompt for writing the introduction or conclusion """
+        instructions = intro_conclusion_instructions.format(topic=state["topic"], formatted_str_sections=self._format_sections(state))    
+        return [SystemMessage(content=instructions)] + [HumanMessage(content=request)]
+
+    def _synthesis_messages(self, state: ResearchGraphState):
+        """ Build the prompt for writing the introduction, report body and conclusion together """
+        system_message = report_synthesis_instructions.format(topic=state["topic"], context=self._format_sections(state))
+        return [SystemMessage(content=system_message)] + [HumanMessage(content="Write the introduction, report and conclusion based upon these memos.")]
+
+    @staticmethod
+    def _synthesis_update(synthesis):
+        """ State update from the synthesis, keeping the error message as the body if the call failed """
+        if not isinstance(synthesis, ReportSynthesis):
+            return {"introduction": "", "content": synthesis.content, "conclusion": ""}
+        return {"introduction": synthesis.introduction, "content": synthesis.content, "conclusion": synthesis.conclusion}
+
+    def _podcast_messages(self, state: ResearchGraphState):
+        """ Build the prompt for writing the podcast script """
+        formatted_analysts = [f"{a.name} ({a.role})" for a in state['analysts']]
+        system_message = self.podcast_prompt.format(topic=state['topic'], analysts=formatted_analysts, content=state['content'])
+        return [SystemMessage(content=system_message)]
+
+    @staticmethod
+    def _final_report(state: ResearchGraphState):
+        """ Combine introduction, content and conclusion """
+        introduction = state.get('introduction', '')
+        conclusion = state.get('conclusion', '')
+        return f"{introduction}\n\n{state['content']}\n\n{conclusion}"
+
+    def write_report(self, state: ResearchGraphState):
+        """ Writes a report """
         report = invoke_llm(
             self.llm, 
-            [SystemMessage(content=system_message)] + [HumanMessage(content=f"Write a report based upon these memos.")],
+            self._report_messages(state),
             function_name="write_report"
         )
         return {"content": report.content}
 
+    async def awrite_report(self, state: ResearchGraphState):
+        """ Async node to write a report """
+        report = await ainvoke_llm(
+            self.llm, 
+            self._report_messages(state),
+            function_name="write_report"
+        )
+        return {"content": report.content}
 
     def write_introduction(self, state: ResearchGraphState):
         """ Writes an introduction for final report"""
-        # Full set of sections
-        sections = state["sections"]
-        topic = state["topic"]
-
-        # Concat all sections together
-        formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
-        
-        # Summarize the sections into a final report
-        instructions = intro_conclusion_instructions.format(topic=topic, formatted_str_sections=formatted_str_sections)    
         intro = invoke_llm(
             self.llm, 
-            [SystemMessage(content=instructions)] + [HumanMessage(content=f"Write the report introduction")],
+            self._intro_conclusion_messages(state, "Write the report introduction"),
+            function_name="write_introduction"
+        )
+        return {"introduction": intro.content}
+
+    async def awrite_introduction(self, state: ResearchGraphState):
+        """ Async node to write an introduction for final report """
+        intro = await ainvoke_llm(
+            self.llm, 
+            self._intro_conclusion_messages(state, "Write the report introduction"),
             function_name="write_introduction"
         )
         return {"introduction": intro.content}
 
     def write_conclusion(self, state: ResearchGraphState):
         """ Writes a conclusion for final report """
-        # Full set of sections
-        sections = state["sections"]
-        topic = state["topic"]
-
-        # Concat all sections together
-        formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
-        
-        # Summarize the sections into a final report
-        instructions = intro_conclusion_instructions.format(topic=topic, formatted_str_sections=formatted_str_sections)    
         conclusion = invoke_llm(
             self.llm, 
-            [SystemMessage(content=instructions)] + [HumanMessage(content=f"Write the report conclusion")],
+            self._intro_conclusion_messages(state, "Write the report conclusion"),
             function_name="write_conclusion"
         )
         return {"conclusion": conclusion.content}
 
+    async def awrite_conclusion(self, state: ResearchGraphState):
+        """ Async node to write a conclusion for final report """
+        conclusion = await ainvoke_llm(
+            self.llm, 
+            self._intro_conclusion_messages(state, "Write the report conclusion"),
+            function_name="write_conclusion"
+        )
+        return {"conclusion": conclusion.content}
 
-    def finalize_report(self, state: ResearchGraphState):
-        """ Generate both formal report and podcast discussion """
-        content = state['content']
-        topic = state['topic']
-        analysts = state['analysts']  # We'll need the analysts for the podcast version
-        introduction = state.get('introduction', '')
-        conclusion = state.get('conclusion', '')
-        
-        final_report = f"{introduction}\n\n{content}\n\n{conclusion}"
-        formatted_analysts = [f"{a.name} ({a.role})" for a in analysts]
-        
-        system_message = self.podcast_prompt.format(topic=topic, analysts=formatted_analysts, content=content)
-        
+    def synthesize_report(self, state: ResearchGraphState):
+        """ Writes the report, introduction and conclusion in a single call """
+        structured_llm = self.llm.with_structured_output(ReportSynthesis)
+        synthesis = invoke_llm(
+            structured_llm, 
+            self._synthesis_messages(state),
+            function_name="synthesize_report"
+        )
+        return self._synthesis_update(synthesis)
+
+    async def asynthesize_report(self, state: ResearchGraphState):
+        """ Async node to write the report, introduction and conclusion in a single call """
+        structured_llm = self.llm.with_structured_output(ReportSynthesis)
+        synthesis = await ainvoke_llm(
+            structured_llm, 
+            self._synthesis_messages(state),
+            function_name="synthesize_report"
+        )
+        return self._synthesis_update(synthesis)
+
+    def write_podcast(self, state: ResearchGraphState):
+        """ Generate the podcast discussion from the report body """
         podcast_version = invoke_llm(
             self.llm, 
-            [SystemMessage(content=system_message)],
+            self._podcast_messages(state),
             function_name="generate_podcast"
         ).content
+        return {"podcast_script": podcast_version}
+
+    async def awrite_podcast(self, state: ResearchGraphState, writer: StreamWriter):
+        """
+        Async node to generate the podcast discussion from the report body.
         
-        return {
-            "final_report": final_report,
-            "podcast_script": podcast_version
-        }
\ No newline at end of file
+        The script is streamed, and every finished line is emitted as a custom stream event
+        ({"podcast_line": ...}) so speech synthesis can start before the script is complete.
+        The writer is injected by LangGraph rather than taken from get_stream_writer(), which
+        doesn't see the run's context in async nodes before Python 3.11.
+        """
+        lines = []
+        async for line in astream_llm_lines(self.llm, self._podcast_messages(state), function_name="generate_podcast"):
+            lines.append(line)
+            writer({"podcast_line": line})
+        return {"podcast_script": "\n".join(lines)}
+
+    def finalize_report(self, state: ResearchGraphState):
+        """ Combine introduction, content and conclusion into the formal report """
+        return {"final_report": self._final_report(state)}
@@ -0,0 +1,246 @@
+"""
+Deterministic local stand-ins for the external services used by a research run.
+
+Every fake waits for a configurable latency (plus optional jitter derived from the
+request, so repeated runs see the same delays) and returns output shaped like the
+real service's, so the whole graph and the podcast assembly run unchanged.
+"""
+
+import asyncio
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from app.models.models import Analyst, Perspectives, ReportSynthesis, SearchQuery
+from app.utils.mp3 import FrameFormat, silence_frames
+
+
+# 24 kHz mono MPEG-2 Layer III at 64 kbps
+FAKE_AUDIO_FORMAT = FrameFormat(version=2, bitrate_index=8, sample_rate_index=1, channel_byte=0xC0)
+# Roughly the speaking rate of the TTS voices
+SPEECH_MS_PER_CHAR = 65
+
+
+@dataclass
+class Latency:
+    """Injected latency in seconds, with jitter spread deterministically by request key"""
+    seconds: float = 0.0
+    jitter: float = 0.0
+
+    def delay(self, key: str) -> float:
+        if not self.jitter:
+            return self.seconds
+        spread = (zlib.crc32(key.encode()) % 1000) / 1000
+        return max(0.0, self.seconds + (spread * 2 - 1) * self.jitter)
+
+    def wait(self, key: str):
+        time.sleep(self.delay(key))
+
+    async def await_(self, key: str):
+        await asyncio.sleep(self.delay(key))
+
+
+def _words(seed: str, count: int) -> str:
+    vocabulary = ("research", "model", "latency", "agents", "data", "inference", "market", "policy",
+                  "hardware", "open", "source", "benchmark", "scaling", "safety", "users", "cost")
+    start = zlib.crc32(seed.encode())
+    return " ".join(vocabulary[(start + i * 7) % len(vocabulary)] for i in range(count))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers from templates keyed on the prompt.
+
+    Supports invoke/ainvoke, line streaming and with_structured_output for the schemas
+    the graph uses, and reports token usage estimated at four characters per token.
+    """
+    latency: Latency = Latency()
+    answer_words: int = 150
+    script_turns: int = 12
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @staticmethod
+    def _prompt(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        system = str(messages[0].content) if messages and isinstance(messages[0], SystemMessage) else ""
+        prompt = self._prompt(messages)
+        if "Tech Talk Roundtable" in system:
+            names = re.findall(r"'([^'(]+?) \(", system) or ["Guest"]
+            speakers = ["Host"] + names
+            lines = [
+                f"[{speakers[i % len(speakers)]}]: {_words(f'{prompt}{i}', 35).capitalize()}."
+                for i in range(self.script_turns)
+            ]
+            return "\n".join(lines + ["[Host]: Stay hungry, stay foolish."])
+        if "interviewing an expert" in system:
+            return f"Can you explain how {_words(prompt, 8)} affects the field?"
+        return f"## {_words(prompt, 3).title()}\n\n{_words(prompt, self.answer_words)}.\n\n### Sources\n[1] https://example.com/{zlib.crc32(prompt.encode())}"
+
+    def _message(self, messages: List[BaseMessage], content: str) -> AIMessage:
+        input_tokens = len(self._prompt(messages)) // 4
+        output_tokens = len(content) // 4
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = self._reply(messages)
+        self.latency.wait(content)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = self._reply(messages)
+        await self.latency.await_(content)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, content))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        content = self._reply(messages)
+        lines = content.splitlines(keepends=True)
+        # Spread the latency over the lines, as a streamed response would
+        per_line = self.latency.delay(content) / max(1, len(lines))
+        for line in lines:
+            await asyncio.sleep(per_line)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=line))
+        usage = self._message(messages, content).usage_metadata
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    def _structured(self, schema, messages) -> Any:
+        prompt = self._prompt(messages if isinstance(messages, list) else [messages])
+        if schema is Perspectives:
+            match = re.search(r"total of (\d+) analysts", prompt)
+            count = int(match.group(1)) if match else 3
+            return Perspectives(analysts=[
+                Analyst(
+                    affiliation=f"Institute {i + 1}",
+                    name=f"Analyst {i + 1}",
+                    gender="female" if i % 2 else "male",
+                    role=_words(f"{prompt}role{i}", 3).title(),
+                    description=_words(f"{prompt}desc{i}", 25)
+                )
+                for i in range(count)
+            ])
+        if schema is SearchQuery:
+            return SearchQuery(search_query=_words(prompt, 6))
+        if schema is ReportSynthesis:
+            return ReportSynthesis(
+                introduction=f"# {_words(prompt, 4).title()}\n\n## Introduction\n\n{_words(f'{prompt}intro', 100)}.",
+                content=f"## Insights\n\n{_words(prompt, self.answer_words)}.\n\n## Sources\n[1] https://example.com/{zlib.crc32(prompt.encode())}",
+                conclusion=f"## Conclusion\n\n{_words(f'{prompt}conclusion', 100)}."
+            )
+        raise ValueError(f"FakeChatModel has no structured output for {schema}")
+
+    def with_structured_output(self, schema, **kwargs):
+        def invoke(messages):
+            self.latency.wait(self._prompt(messages))
+            return self._structured(schema, messages)
+
+        async def ainvoke(messages):
+            await self.latency.await_(self._prompt(messages))
+            return self._structured(schema, messages)
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=f"fake_structured_{schema.__name__}")
+
+
+class FakeTavilySearch:
+    """Stand-in for TavilySearchResults"""
+
+    def __init__(self, latency: Latency, max_results: int = 5):
+        self.latency = latency
+        self.max_results = max_results
+
+    def _results(self, query: str) -> List[dict]:
+        return [
+            {"url": f"https://example.com/{i}/{zlib.crc32(query.encode())}", "content": _words(f"{query}{i}", 120)}
+            for i in range(self.max_results)
+        ]
+
+    def invoke(self, query: str) -> List[dict]:
+        self.latency.wait(query)
+        return self._results(query)
+
+    async def ainvoke(self, query: str) -> List[dict]:
+        await self.latency.await_(query)
+        return self._results(query)
+
+
+class FakeWikipediaLoader:
+    """Stand-in for WikipediaLoader; set latency on the class before use"""
+    latency = Latency()
+
+    def __init__(self, query: str, load_max_docs: int = 2):
+        self.query = query
+        self.load_max_docs = load_max_docs
+
+    def load(self) -> List[Document]:
+        self.latency.wait(self.query)
+        return [
+            Document(
+                page_content=_words(f"{self.query}{i}", 300),
+                metadata={"source": f"https://en.wikipedia.org/wiki/Fake_{i}", "page": f"Fake {i}"}
+            )
+            for i in range(self.load_max_docs)
+        ]
+
+
+class FakeNewsApi:
+    """Stand-in for NewsApiClient"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def get_everything(self, q: str, page_size: int = 10, **kwargs) -> dict:
+        self.latency.wait(q)
+        return {
+            "status": "ok",
+            "totalResults": page_size,
+            "articles": [
+                {
+                    "url": f"https://news.example.com/{i}/{zlib.crc32(q.encode())}",
+                    "title": _words(f"{q}title{i}", 6),
+                    "publishedAt": "2025-01-01T00:00:00Z",
+                    "content": _words(f"{q}{i}", 60)
+                }
+                for i in range(page_size)
+            ]
+        }
+
+
+class _FakeSpeechResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+class _FakeSpeech:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    async def create(self, model: str, voice: str, input: str, instructions: Optional[str] = None, **kwargs):
+        await self.latency.await_(f"{voice}{input}")
+        return _FakeSpeechResponse(silence_frames(FAKE_AUDIO_FORMAT, len(input) * SPEECH_MS_PER_CHAR))
+
+
+class _FakeAudio:
+    def __init__(self, latency: Latency):
+        self.speech = _FakeSpeech(latency)
+
+
+class FakeTTSClient:
+    """Stand-in for the AsyncOpenAI client used by TTSEngine, returning silent MP3 audio"""
+
+    def __init__(self, latency: Latency):
+        self.audio = _FakeAudio(latency)
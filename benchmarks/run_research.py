@@ -0,0 +1,225 @@
+"""
+Offline end-to-end benchmark of research runs and podcast synthesis.
+
+Runs the async research graph (analysts, interviews, report, podcast script) followed by
+generate_podcast_audio_async against the local fakes in benchmarks/fakes.py, so no API
+keys are needed and no tokens are spent. Each concurrency level reports throughput,
+end-to-end latency percentiles, peak RSS and the mean time per graph node.
+
+Usage:
+    poetry run python -m benchmarks.run_research --concurrency 1 10 100 --llm-latency 0.8 --tts-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from uuid import uuid4
+
+# Settings require API keys, which the fakes never use
+for _key in ("OPENAI_API_KEY", "NEWS_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(_key, "benchmark")
+
+from app.config import settings
+from app.services import clients, services
+from app.utils.metrics import timed, trace_run
+from app.workflows import interview
+from benchmarks.fakes import (
+    FakeChatModel, FakeNewsApi, FakeTavilySearch, FakeTTSClient, FakeWikipediaLoader, Latency
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def install_fakes(args):
+    """Point the LLM, search clients and TTS engine at the local fakes"""
+    # Caches would turn every run after the first into cache hits
+    settings.LLM_CACHE_ENABLED = False
+    settings.SEARCH_CACHE_ENABLED = False
+    settings._llm = FakeChatModel(latency=Latency(args.llm_latency, args.jitter * args.llm_latency))
+
+    search_latency = Latency(args.search_latency, args.jitter * args.search_latency)
+    clients._clients["tavily"] = FakeTavilySearch(search_latency)
+    clients._clients["newsapi"] = FakeNewsApi(search_latency)
+    FakeWikipediaLoader.latency = search_latency
+    interview.WikipediaLoader = FakeWikipediaLoader
+
+    services._tts_engine = services.TTSEngine(
+        client=FakeTTSClient(Latency(args.tts_latency, args.jitter * args.tts_latency)),
+        model="fake-tts",
+        max_concurrency=settings.TTS_MAX_CONCURRENCY,
+        requests_per_minute=args.tts_rpm,
+        cache=None
+    )
+
+
+class RssSampler:
+    """Samples the resident set size on a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        # Lifetime peak where /proc isn't available (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def run_session(graph, topic: str, max_analysts: int) -> dict:
+    """One user session: create analysts, approve them, run the research and synthesize the podcast"""
+    thread_id = f"bench-{uuid4()}"
+    thread = {"configurable": {"thread_id": thread_id}}
+    started = time.perf_counter()
+    with trace_run(thread_id) as trace:
+        await graph.ainvoke({"topic": topic, "max_analysts": max_analysts}, thread)
+        await graph.aupdate_state(thread, {"human_analyst_feedback": None}, as_node="human_feedback")
+        async for _ in graph.astream(None, thread, stream_mode="updates"):
+            pass
+        state = (await graph.aget_state(thread)).values
+        with timed("node", "generate_audio"):
+            audio = await services.generate_podcast_audio_async(state["podcast_script"], state["analysts"])
+    if not audio:
+        raise RuntimeError("No podcast audio was produced")
+    return {
+        "latency": time.perf_counter() - started,
+        "totals": trace.totals(),
+        "audio_bytes": len(audio)
+    }
+
+
+async def run_level(graph, concurrency: int, runs: int, max_analysts: int) -> dict:
+    """Run `runs` sessions with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int):
+        async with semaphore:
+            try:
+                return await run_session(graph, f"Benchmark topic {index}", max_analysts)
+            except Exception as e:
+                logger.error(f"Session {index} failed: {str(e)}", exc_info=True)
+                return None
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[bounded(i) for i in range(runs)])
+        elapsed = time.perf_counter() - started
+
+    succeeded = [r for r in results if r is not None]
+    latencies = [r["latency"] for r in succeeded]
+    node_seconds = {}
+    for result in succeeded:
+        for key, seconds in result["totals"].items():
+            if key.startswith("node:"):
+                node = key.split(":", 1)[1]
+                node_seconds[node] = node_seconds.get(node, 0) + seconds
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "failures": runs - len(succeeded),
+        "elapsed_seconds": round(elapsed, 2),
+        "runs_per_minute": round(len(succeeded) / elapsed * 60, 2) if elapsed else 0,
+        "p50_seconds": round(percentile(latencies, 50), 2),
+        "p99_seconds": round(percentile(latencies, 99), 2),
+        "peak_rss_mb": round(rss.peak / 1048576, 1),
+        # Summed over concurrent invocations (e.g. one interview per analyst), averaged per run
+        "node_seconds_per_run": {
+            node: round(total / len(succeeded), 2)
+            for node, total in sorted(node_seconds.items(), key=lambda item: item[1], reverse=True)
+        } if succeeded else {}
+    }
+
+
+def print_report(levels: list):
+    print(f"{'conc':>5} {'runs':>5} {'fail':>5} {'runs/min':>9} {'p50 s':>8} {'p99 s':>8} {'peak RSS MB':>12}")
+    for level in levels:
+        print(f"{level['concurrency']:>5} {level['runs']:>5} {level['failures']:>5} {level['runs_per_minute']:>9} "
+              f"{level['p50_seconds']:>8} {level['p99_seconds']:>8} {level['peak_rss_mb']:>12}")
+    for level in levels:
+        print(f"\nMean time per node per run at concurrency {level['concurrency']}:")
+        for node, seconds in level["node_seconds_per_run"].items():
+            print(f"  {node:<24} {seconds:>8.2f} s")
+
+
+async def main(args):
+    from app.workflows.graph_builder import build_research_graph
+
+    install_fakes(args)
+    graph = build_research_graph(use_async=True)
+    levels = []
+    for concurrency in args.concurrency:
+        runs = max(args.runs, concurrency)
+        print(f"Running {runs} sessions at concurrency {concurrency}...", file=sys.stderr)
+        levels.append(await run_level(graph, concurrency, runs, args.max_analysts))
+    print_report(levels)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "levels": levels}, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100],
+                        help="Concurrent sessions per level")
+    parser.add_argument("--runs", type=int, default=20,
+                        help="Sessions per level (at least the level's concurrency)")
+    parser.add_argument("--max-analysts", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per search request")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="Seconds per TTS request")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Latency spread as a fraction of each latency (deterministic per request)")
+    parser.add_argument("--tts-rpm", type=int, default=1_000_000,
+                        help="TTS rate limit (defaults to effectively unlimited)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's INFO logs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main(args))